@@ -1,21 +1,38 @@
 
+import math
 import time
 import random
-from ai.minimax import minimax, iterative_deepening
-from ai.heuristics import AI, HUMAN, EMPTY
+from concurrent.futures import ProcessPoolExecutor
+from ai.minimax import (minimax, iterative_deepening, parallel_search, generate_moves_nearby,
+                        order_moves, from_tt_move, principal_variation)
+from ai.heuristics import AI, HUMAN, EMPTY, EVALUATORS
+from ai.transposition import TranspositionTable
+from ai.move_ordering import MoveOrderer
+from ai.search_stats import SearchStats
+from ai.time_manager import TimeManager, SearchTimeout
+from ai.threats import find_vcf
+from ai.tactics import scan_tactics
+from ai.opening_book import load_book, OPENING_BOOK_PATH
+from ai.persistent_cache import CACHE_MIN_DEPTH
+
+# Share of time_limit each forcing-sequence search may use
+FORCING_TIME_SHARE = 0.2
+
+# Pondering searches this many likely HUMAN replies, this many plies
+# deeper than a normal move
+PONDER_REPLIES = 2
+PONDER_EXTRA_DEPTH = 1
 
 
 class AIPlayer:
-    def __init__(self, depth=None, mode=None, difficulty="easy", heuristic=None):
+    def __init__(self, depth=None, mode=None, difficulty="easy", heuristic=None, tt_size_mb=16,
+                 workers=1, seed=None, logger=None, opening_book=OPENING_BOOK_PATH,
+                 cache=None):
 
         self.difficulty = difficulty.lower() if isinstance(difficulty, str) else "easy"
 
-        self.heuristic_map = {
-            "Simple": 1,
-            "Pattern": 2,
-            "Advanced": 3,
-            "Dynamic": 4
-        }
+        # "Simple": 1, "Pattern": 2, "Advanced": 3, "Dynamic": 4
+        self.heuristic_map = {ev.name: mode for mode, ev in EVALUATORS.items()}
 
         if heuristic is not None and heuristic in self.heuristic_map:
             mode_from_gui = self.heuristic_map[heuristic]
@@ -24,10 +41,10 @@ class AIPlayer:
 
         # DIFFICULTY PRESETS
         difficulty_config = {
-            "easy":    {"depth": 1, "heuristic": 1, "time": 0.2, "block": False, "win": False, "fork": False, "rand": 0.3, "iter": False},
-            "medium":  {"depth": 2, "heuristic": 2, "time": 0.6, "block": True,  "win": False, "fork": False, "rand": 0.1, "iter": False},
-            "hard":    {"depth": 3, "heuristic": 3, "time": 1.5, "block": True,  "win": True,  "fork": True,  "rand": 0.05,"iter": False},
-            "expert":  {"depth": 4, "heuristic": 4, "time": 5.0, "block": True,  "win": True,  "fork": True,  "rand": 0.0, "iter": True},
+            "easy":    {"depth": 1, "heuristic": 1, "time": 0.2, "block": False, "win": False, "fork": False, "rand": 0.3, "iter": False, "book": False, "ponder": False},
+            "medium":  {"depth": 2, "heuristic": 2, "time": 0.6, "block": True,  "win": False, "fork": False, "rand": 0.1, "iter": False, "book": False, "ponder": False},
+            "hard":    {"depth": 3, "heuristic": 3, "time": 1.5, "block": True,  "win": True,  "fork": True,  "rand": 0.05,"iter": False, "book": True, "ponder": True},
+            "expert":  {"depth": 4, "heuristic": 4, "time": 5.0, "block": True,  "win": True,  "fork": True,  "rand": 0.0, "iter": True, "book": True, "ponder": True},
         }
 
         cfg = difficulty_config.get(self.difficulty, difficulty_config["easy"])
@@ -45,116 +62,240 @@ class AIPlayer:
         self.enable_forking = cfg["fork"]
         self.randomness = cfg["rand"]
         self.use_iterative = cfg["iter"]
+        self.enable_pondering = cfg["ponder"]
+
+        # Precomputed opening moves (None if disabled or not built)
+        self.book = load_book(opening_book) if cfg["book"] and opening_book else None
+
+        # Each player owns its transposition table so memory stays bounded
+        self.tt_size_mb = tt_size_mb
+        self.tt = TranspositionTable(tt_size_mb)
+        self.orderer = MoveOrderer()
+
+        # Optional ai.persistent_cache.PersistentCache the table is
+        # loaded from and saved to between games
+        self.cache = cache
+
+        # Random moves come from a private generator so a fixed seed
+        # reproduces the same game
+        self.rng = random.Random(seed)
+
+        # workers > 1 splits the root search across a process pool
+        self.workers = max(1, int(workers))
+        self._executor = None
+
+        # Statistics of the most recent get_best_move call, optionally
+        # reported through a utils.logger.GameLogger
+        self.logger = logger
+        self.last_stats = None
+        self.last_forcing_line = None
+
+        # board.hash -> (depth, move) for positions searched by ponder()
+        self.ponder_results = {}
+        self.last_ponder_hit = False
+
+    def get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        """Shut down the worker processes, if any were started"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def load_cache(self, n):
+        """Fill the transposition table from the persistent cache"""
+        if self.cache is not None:
+            self.tt.merge(self.cache.load(n, self.mode, self.tt.size // 2))
+
+    def save_cache(self, n):
+        """Write this game's deeper table entries to the persistent cache"""
+        if self.cache is not None:
+            self.cache.save(n, self.mode, self.tt.export(min_depth=CACHE_MIN_DEPTH))
 
     def in_bounds(self, n, r, c):
         return 0 <= r < n and 0 <= c < n
 
-    def find_winning_move(self, board, player):
-        n = board.n
-        g = board.grid
-        for r in range(n):
-            for c in range(n):
-                if g[r][c] != EMPTY:
-                    continue
-                g[r][c] = player
-                if board.check_winner(player):
-                    g[r][c] = EMPTY
-                    return (r, c)
-                g[r][c] = EMPTY
-        return None
+    def find_winning_move(self, board, player, report=None):
+        report = report or scan_tactics(board)
+        wins = report.wins[player]
+        return min(wins) if wins else None
 
-    def find_block_move(self, board):
-        n = board.n
-        g = board.grid
-        dirs = [(1,0),(0,1),(1,1),(1,-1)]
-
-        for dr, dc in dirs:
-            for r in range(n):
-                for c in range(n):
-                    cells = []
-                    vals = []
-                    for i in range(5):
-                        rr = r + i*dr
-                        cc = c + i*dc
-                        if not self.in_bounds(n, rr, cc):
-                            break
-                        cells.append((rr, cc))
-                        vals.append(g[rr][cc])
-                    if len(vals) < 5:
-                        continue
-                    if vals.count(HUMAN) == 4 and vals.count(EMPTY) == 1:
-                        return cells[vals.index(EMPTY)]
-        return None
+    def find_block_move(self, board, report=None):
+        return self.find_winning_move(board, HUMAN, report)
 
-    def find_fork_move(self, board, player):
-        n = board.n
-        g = board.grid
-        for r in range(n):
-            for c in range(n):
-                if g[r][c] != EMPTY:
-                    continue
-                g[r][c] = player
-                threats = 0
-                for rr in range(n):
-                    for cc in range(n):
-                        if g[rr][cc] == EMPTY:
-                            g[rr][cc] = player
-                            if board.check_winner(player):
-                                threats += 1
-                            g[rr][cc] = EMPTY
-                        if threats >= 2:
-                            g[r][c] = EMPTY
-                            return (r, c)
-                g[r][c] = EMPTY
+    def find_fork_move(self, board, player, stop_event=None, budget=None):
+        """
+        First move of a forcing win (continuous fours ending in a double
+        threat) for player, searched within a share of time_limit (and
+        never past budget, the TimeManager of the whole move). The full
+        line is kept in self.last_forcing_line.
+        """
+        time_limit = self.time_limit * FORCING_TIME_SHARE
+        if budget is not None:
+            time_limit = max(1e-3, min(time_limit, budget.remaining()))
+        line = find_vcf(board, player, time_limit=time_limit, stop_event=stop_event)
+        if line:
+            self.last_forcing_line = line
+            return line[0]
         return None
 
 
 
-    def get_best_move(self, board):
+    def predict_replies(self, board, k=PONDER_REPLIES):
+        """Likely HUMAN moves on board (HUMAN to move), best guess first"""
+        replies = order_moves(board, generate_moves_nearby(board), HUMAN, self.mode)
+        # The previous search's table knows the reply it expected
+        key, sym = board.canonical_hash()
+        expected = from_tt_move(board, self.tt.best_move(key), sym)
+        if expected in replies:
+            replies.remove(expected)
+            replies.insert(0, expected)
+        return replies[:k]
+
+    def ponder(self, board, stop_event, k=PONDER_REPLIES):
+        """
+        Think on the human's time: search the positions after the k likely
+        HUMAN replies, one depth at a time for all of them, until
+        stop_event is set or depth + PONDER_EXTRA_DEPTH is reached.
+
+        The searches fill the transposition table; the move of every
+        completed iteration is kept in self.ponder_results, which the next
+        get_best_move call answers from when the human played one of the
+        predicted moves (a ponder hit).
+        """
+        self.ponder_results = {}
+        if board.is_game_over():
+            return
+        positions = []
+        for r, c in self.predict_replies(board, k):
+            after = board.copy()
+            after.make_move(r, c, HUMAN)
+            if not after.is_game_over():
+                positions.append(after)
+
+        self.tt.new_search()
+        clock = TimeManager(stop_event=stop_event)
+        for depth in range(1, self.depth + PONDER_EXTRA_DEPTH + 1):
+            for after in positions:
+                try:
+                    _, move = minimax(after, depth, -math.inf, math.inf, True, self.mode, clock,
+                                      self.tt, self.orderer)
+                except SearchTimeout:
+                    return
+                if move is not None:
+                    self.ponder_results[after.hash] = (depth, move)
+
+    def get_best_move(self, board, stop_event=None):
+        """
+        Choose the AI's move on board
+
+        stop_event (a threading.Event) lets another thread cancel the
+        search; the result is then meaningless and should be discarded.
+        Search counters end up in self.last_stats.
+        """
+        stats = SearchStats()
+        self.last_forcing_line = None
+        self.last_ponder_hit = False
+        move = self._choose_move(board, stop_event, stats)
+        self.ponder_results = {}
+        self.last_stats = stats.stop()
+        if self.logger is not None and stats.nodes:
+            self.logger.log_ai_thinking(stats.depth, stats.nodes, stats.elapsed)
+            self.logger.log_search_stats(stats.as_dict())
+        return move
+
+    def _choose_move(self, board, stop_event, stats):
+        # One deadline for the whole move: every stage below gets only
+        # what the earlier ones left of time_limit
+        budget = TimeManager(self.time_limit, stop_event)
         n = board.n
         g = board.grid
 
         if all(g[r][c] == EMPTY for r in range(n) for c in range(n)):
             return (n//2, n//2)
 
-        if random.random() < self.randomness:
+        if self.rng.random() < self.randomness:
             empties = [(r,c) for r in range(n) for c in range(n) if g[r][c] == EMPTY]
-            return random.choice(empties)
+            return self.rng.choice(empties)
+
+        if self.book is not None:
+            move = self.book.lookup(board, self.mode)
+            if move:
+                return move
+
+        # One pass over the windows answers all the immediate questions
+        report = None
+        if self.enable_winning or self.enable_blocking or self.enable_forking:
+            report = scan_tactics(board)
 
         if self.enable_winning:
-            win = self.find_winning_move(board, AI)
+            win = self.find_winning_move(board, AI, report)
             if win:
                 return win
             
         if self.enable_blocking:
-            block = self.find_winning_move(board, HUMAN)
+            block = self.find_block_move(board, report)
             if block:
                 return block
 
+        # Our own open four and forcing win come before any defence
         if self.enable_forking:
-            fork = self.find_fork_move(board, AI)
+            if not report.wins[HUMAN] and report.open_fours[AI]:
+                return min(report.open_fours[AI])
+            fork = self.find_fork_move(board, AI, stop_event, budget)
             if fork:
                 return fork
+
+        # Ponder hit: this position was already searched at least as deep,
+        # but never in place of a forcing win found above
+        pondered = self.ponder_results.get(board.hash)
+        if pondered is not None and pondered[0] >= self.depth and board.is_valid_move(*pondered[1]):
+            self.last_ponder_hit = True
+            return pondered[1]
+
         if self.enable_forking:
-            opp_fork = self.find_fork_move(board, HUMAN)
+            if not report.wins[HUMAN] and report.open_fours[HUMAN]:
+                return min(report.open_fours[HUMAN])
+            opp_fork = self.find_fork_move(board, HUMAN, stop_event, budget)
             if opp_fork:
                 return opp_fork
 
-        start = time.time()
+        self.tt.new_search()
+        self.orderer.new_search()
+
+        if self.workers > 1:
+            move = parallel_search(board, self.depth, self.mode, self.get_executor(), self.workers,
+                                   max(1e-3, budget.remaining()), self.tt,
+                                   iterative=self.use_iterative,
+                                   tt_size_mb=self.tt_size_mb, stats=stats)
+            if move:
+                return move
 
         if self.use_iterative:
-            move = iterative_deepening(board, self.depth, self.mode, time_limit=self.time_limit)
+            move = iterative_deepening(board, self.depth, self.mode,
+                                       time_limit=max(1e-3, budget.remaining()),
+                                       tt=self.tt, orderer=self.orderer, stop_event=stop_event,
+                                       stats=stats)
             if move:
                 return move
 
-        _, move = minimax(
-            board,
-            self.depth,
-            -1e9, 1e9,
-            True,
-            self.mode,
-            start,
-            self.time_limit
-        )
+        # Whatever the searches above left of the budget
+        start = time.time()
+        clock = TimeManager(max(1e-3, budget.remaining()), stop_event)
+        try:
+            _, move = minimax(board, self.depth, -1e9, 1e9, True, self.mode, clock, self.tt,
+                              self.orderer, stats=stats)
+            stats.finish_iteration(self.depth, time.time() - start)
+            stats.pv = principal_variation(board, self.tt, self.depth)
+        except SearchTimeout:
+            # Out of time: the best root move whose subtree was searched
+            # completely, else the most promising move by threat score
+            move = clock.root_best
+            if move is None:
+                moves = order_moves(board, generate_moves_nearby(board), AI, self.mode)
+                move = moves[0] if moves else None
 
         return move
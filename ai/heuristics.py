@@ -34,47 +34,303 @@ def classify_segment(segment, player):
         pass
     return player_count, segment.count(EMPTY)
 
+# Line windows are 7 cells: the 5 cells of a window plus the cell before
+# and after it. Each cell is a base-4 digit (0 empty, 1 AI, 2 HUMAN,
+# 3 off the board; v % 3 maps a grid value to its digit), so a window is
+# a 14-bit code and its SCORES value is a single table lookup.
+_LINE_WIDTH = 7
+_LINE_WALL = 3
+
+def _build_line_tables():
+    """LINE_TABLE[player][code]: SCORES value of a 7-cell window for player"""
+    size = 4 ** _LINE_WIDTH
+    tables = {AI: [0] * size, HUMAN: [0] * size}
+    for code in range(size):
+        digits = [(code >> (2 * k)) & 3 for k in range(_LINE_WIDTH)]
+        cells = digits[1:6]
+        if _LINE_WALL in cells:
+            continue
+        open_ends = (digits[0] == 0) + (digits[6] == 0)
+        for player, me, opp in ((AI, 1, 2), (HUMAN, 2, 1)):
+            cnt = cells.count(me)
+            if cnt and opp not in cells:
+                tables[player][code] = SCORES.get((cnt, open_ends), 0)
+    return tables
+
+LINE_TABLE = _build_line_tables()
+
+_line_scan_tables = {}
+
+def line_scan_table(n):
+    """
+    Every line of an n x n board long enough to hold five, for the
+    rolling window scan in evaluate_board_by_lines
+
+    Returns a list of (head, tail): head holds the flat indices of the
+    first 7-cell window (-1 for the off-board cell before the line), tail
+    the cells entering as the window slides, ending with -1.
+    """
+    table = _line_scan_tables.get(n)
+    if table is None:
+        table = []
+        for dr,dc in [(0,1),(1,0),(1,1),(1,-1)]:
+            for r in range(n):
+                for c in range(n):
+                    if in_bounds(n, r - dr, c - dc):
+                        continue  # not the start of a line
+                    line = [-1]
+                    rr, cc = r, c
+                    while in_bounds(n, rr, cc):
+                        line.append(rr * n + cc)
+                        rr += dr
+                        cc += dc
+                    line.append(-1)
+                    if len(line) >= _LINE_WIDTH:
+                        table.append((tuple(line[:_LINE_WIDTH]), tuple(line[_LINE_WIDTH:])))
+        _line_scan_tables[n] = table
+    return table
+
+_score_table = None
+
 def evaluate_board_by_lines(board, player):
-    n = board.n
-    g = board.grid
+    if board.backend == "numpy":
+        global _score_table
+        from game import vectorized
+        if _score_table is None:
+            _score_table = vectorized.score_table(SCORES)
+        return vectorized.evaluate_lines(board.grid, player, _score_table)
+
+    # One pass per line: the window code slides by a shift and an OR, and
+    # flat[-1] is the off-board digit
+    flat = [v % 3 for row in board.grid for v in row]
+    flat.append(_LINE_WALL)
+    table = LINE_TABLE[player]
     total = 0
+    for head, tail in line_scan_table(board.n):
+        code = 0
+        for k, i in enumerate(head):
+            code |= flat[i] << (2 * k)
+        total += table[code]
+        for i in tail:
+            code = (code >> 2) | (flat[i] << 12)
+            total += table[code]
+    return total if player == AI else -total
+
+_window_tables = {}
+
+def window_tables(n):
+    """
+    Precompute every 5-cell window of an n x n board
+
+    Returns (windows, members) where windows[w] is (cells, before, after)
+    with flat cell indices (-1 when the end cell is off the board) and
+    members[i] lists the windows containing cell i.
+    """
+    tables = _window_tables.get(n)
+    if tables is not None:
+        return tables
+    windows = []
+    members = [[] for _ in range(n * n)]
     dirs = [(0,1),(1,0),(1,1),(1,-1)]
     for dr,dc in dirs:
         for r in range(n):
             for c in range(n):
-                seg = scan_five_segment(g, r, c, dr, dc, n)
-                if seg is None:
+                if not in_bounds(n, r + 4*dr, c + 4*dc):
                     continue
-                if player == AI:
-                    me = AI
-                    opp = HUMAN
-                else:
-                    me = HUMAN
-                    opp = AI
+                w = len(windows)
+                cells = tuple((r + i*dr) * n + (c + i*dc) for i in range(5))
+                before = (r - dr) * n + (c - dc) if in_bounds(n, r - dr, c - dc) else -1
+                after = (r + 5*dr) * n + (c + 5*dc) if in_bounds(n, r + 5*dr, c + 5*dc) else -1
+                windows.append((cells, before, after))
+                for i in cells:
+                    members[i].append(w)
+    tables = (windows, members)
+    _window_tables[n] = tables
+    return tables
 
-                if opp in seg and me in seg:
-                    continue 
+_window_code_tables = {}
 
-                cnt = seg.count(me)
-                empty_cnt = seg.count(EMPTY)
-                if cnt == 0:
-                    continue
-                before_r, before_c = r - dr, c - dc
-                after_r, after_c = r + 5*dr, c + 5*dc
-                open_ends = 0
-                if in_bounds(n, before_r, before_c):
-                    if g[before_r][before_c] == EMPTY:
-                        open_ends += 1
+def window_codes(n):
+    """
+    LINE_TABLE codes for the windows of window_tables(n)
+
+    Returns (base_codes, members) where base_codes[w] is the code of
+    window w on an empty board and members[i] lists (w, weight) for every
+    window that has cell i among its 7 cells, weight being the place
+    value of the cell's digit.
+    """
+    tables = _window_code_tables.get(n)
+    if tables is not None:
+        return tables
+    windows = window_tables(n)[0]
+    base_codes = []
+    members = [[] for _ in range(n * n)]
+    for w, (cells, before, after) in enumerate(windows):
+        code = 0
+        for k, i in enumerate((before,) + cells + (after,)):
+            if i < 0:
+                code += _LINE_WALL << (2 * k)
+            else:
+                members[i].append((w, 1 << (2 * k)))
+        base_codes.append(code)
+    tables = (base_codes, members)
+    _window_code_tables[n] = tables
+    return tables
+
+class PatternEvaluator:
+    """
+    Incremental version of evaluate_board_by_lines and center_control_bonus
+
+    Keeps per-window piece counts, the LINE_TABLE code of every window
+    and the running SCORES totals; a stone updates the codes of the
+    windows around it and the totals by table lookups.
+    Windows holding three or four stones of one player and none of the
+    other are also indexed, so threats can be found without a board scan.
+    Attach it with pattern_evaluator(board).
+    """
+
+    def __init__(self, board):
+        n = board.n
+        self.n = n
+        self.windows, self.members = window_tables(n)
+        nw = len(self.windows)
+        self.cells = [EMPTY] * (n * n)
+        self.count = {AI: [0] * nw, HUMAN: [0] * nw}
+        base_codes, self.code_members = window_codes(n)
+        self.codes = list(base_codes)
+        self.totals = {AI: 0, HUMAN: 0}
+        self.center = {AI: 0, HUMAN: 0}
+        # threats[player][k]: windows with k of player's stones and no others
+        self.threats = {AI: {3: set(), 4: set()}, HUMAN: {3: set(), 4: set()}}
+        for r, c, player in board.move_history:
+            self.on_place(r, c, player)
+
+    def _update(self, r, c, player, value, delta):
+        i = r * self.n + c
+        self.cells[i] = value
+        count = self.count[player]
+        other = self.count[-player]
+        mine = self.threats[player]
+        theirs = self.threats[-player]
+        for w in self.members[i]:
+            old = count[w]
+            new = old + delta
+            count[w] = new
+            if other[w] == 0:
+                if old in mine:
+                    mine[old].discard(w)
+                if new in mine:
+                    mine[new].add(w)
+            if (old == 0 or new == 0) and other[w] in theirs:
+                # the window just became (un)usable for the opponent
+                if new == 0:
+                    theirs[other[w]].add(w)
                 else:
-                    pass
-                if in_bounds(n, after_r, after_c):
-                    if g[after_r][after_c] == EMPTY:
-                        open_ends += 1
+                    theirs[other[w]].discard(w)
+        center = self.n // 2
+        self.center[player] += delta * max(0, 10 - (abs(r - center) + abs(c - center)))
+        digit = delta * (player % 3)
+        codes = self.codes
+        ai_table = LINE_TABLE[AI]
+        human_table = LINE_TABLE[HUMAN]
+        ai_total = self.totals[AI]
+        human_total = self.totals[HUMAN]
+        for w, weight in self.code_members[i]:
+            old = codes[w]
+            new = old + digit * weight
+            codes[w] = new
+            ai_total += ai_table[new] - ai_table[old]
+            human_total += human_table[new] - human_table[old]
+        self.totals[AI] = ai_total
+        self.totals[HUMAN] = human_total
+
+    def on_place(self, r, c, player):
+        self._update(r, c, player, player, 1)
+
+    def on_remove(self, r, c, player):
+        self._update(r, c, player, EMPTY, -1)
+
+    def line_score(self, player):
+        """Same value as evaluate_board_by_lines(board, player)"""
+        return self.totals[player] if player == AI else -self.totals[player]
+
+    def center_bonus(self, player):
+        """Same value as center_control_bonus(board, player)"""
+        return self.center[player]
 
-                key = (cnt, open_ends)
-                add = SCORES.get(key, 0)
-                total += add if me == AI else -add
-    return total
+    def _empty_cells(self, windows):
+        n = self.n
+        cells = self.cells
+        found = set()
+        for w in windows:
+            for i in self.windows[w][0]:
+                if cells[i] == EMPTY:
+                    found.add(divmod(i, n))
+        return found
+
+    def winning_cells(self, player):
+        """Empty cells where player would complete five"""
+        return self._empty_cells(self.threats[player][4])
+
+    def four_cells(self, player):
+        """Empty cells where player would make a four (threaten five)"""
+        return self._empty_cells(self.threats[player][3])
+
+def pattern_evaluator(board):
+    """Return the PatternEvaluator attached to board, attaching one if needed"""
+    ev = board.listeners.get('pattern')
+    if ev is None:
+        ev = board.attach('pattern', PatternEvaluator(board))
+    return ev
+
+def mask_run(mine, occupied, pos, lo, hi):
+    """
+    Length of the line mine would have through pos on a Board line
+    bitmask (see Board.lines)
+
+    Returns (count, open_ends) for the run of mine's bits through pos
+    (pos counted as set), looking at most four cells each way; an end is
+    open when the next position lies in [lo, hi] and is not occupied.
+    """
+    above = mine >> (pos + 1)
+    up = min(4, ((~above) & (above + 1)).bit_length() - 1)
+    zeros_below = ~mine & ((1 << pos) - 1)
+    down = min(4, pos - zeros_below.bit_length())
+    open_ends = 0
+    p = pos + up + 1
+    if p <= hi and not (occupied >> p) & 1:
+        open_ends += 1
+    p = pos - down - 1
+    if p >= lo and not (occupied >> p) & 1:
+        open_ends += 1
+    return 1 + up + down, open_ends
+
+def local_threat_score(board, r, c, player):
+    """
+    Cheap score of playing the empty cell (r, c) for move ordering
+
+    Looks only at the four lines through the cell: the runs player would
+    extend (attack) and the opponent runs it would cut (defence, weighted
+    half). Runs are read from the board's line bitmasks, so the work per
+    call is a few integer operations per line.
+    """
+    mine = board.lines[player]
+    theirs = board.lines[-player]
+    bounds = board.line_bounds
+    score = 0
+    for family, line, pos, _ in board.line_cells[r * board.n + c]:
+        a = mine[family][line]
+        b = theirs[family][line]
+        lo, hi = bounds[family][line]
+        count, open_ends = mask_run(a, a | b, pos, lo, hi)
+        if count >= 5:
+            count, open_ends = 5, 2
+        score += SCORES.get((count, open_ends), 0)
+        count, open_ends = mask_run(b, a | b, pos, lo, hi)
+        if count >= 5:
+            count, open_ends = 5, 2
+        score += SCORES.get((count, open_ends), 0) // 2
+    return score
 
 def center_control_bonus(board, player):
     n = board.n
@@ -88,16 +344,17 @@ def center_control_bonus(board, player):
     return bonus
 
 def heuristic2(board):
-    if board.check_winner(AI):
+    if board.winner == AI:
         return 10**9
-    if board.check_winner(HUMAN):
+    if board.winner == HUMAN:
         return -10**9
 
+    ev = pattern_evaluator(board)
     score = 0
-    score += evaluate_board_by_lines(board, AI)
-    score -= evaluate_board_by_lines(board, HUMAN)
-    score += center_control_bonus(board, AI) * 5
-    score -= center_control_bonus(board, HUMAN) * 5
+    score += ev.line_score(AI)
+    score -= ev.line_score(HUMAN)
+    score += ev.center_bonus(AI) * 5
+    score -= ev.center_bonus(HUMAN) * 5
     return score
 
 def heuristic1(board):
@@ -124,3 +381,284 @@ def heuristic1(board):
                         elif grid[nr][nc] == HUMAN:
                             score -= 1
     return score
+
+# Shapes recognised by the "Advanced" evaluator in 6-cell windows
+ADVANCED_SCORES = {
+    "five": 1000000,
+    "open_four": 100000,   # .XXXX.
+    "four": 10000,         # four stones and a gap in five cells (XX.XX too)
+    "open_three": 5000,    # three in the middle four cells, both ends empty
+    "three": 500,
+    "open_two": 200,
+    "two": 50,
+    "one": 1,
+}
+
+# Window cell codes: the 6 cells of a window form a base-4 number
+_WALL = 3
+_SHAPE_WIDTH = 6
+
+def classify_shape(cells):
+    """
+    Best shape for the player coded 1 in a 6-cell window
+
+    cells holds 0 (empty), 1 (player), 2 (opponent) or 3 (off the
+    board). The rules read the same in both directions, so mirrored
+    windows get the same shape.
+    """
+    subs = (cells[:5], cells[1:])
+    inner = cells[1:5]
+    ends_open = cells[0] == EMPTY and cells[5] == EMPTY
+
+    def sub_has(me, empty):
+        return any(s.count(1) == me and s.count(EMPTY) == empty for s in subs)
+
+    if sub_has(5, 0):
+        return "five"
+    if ends_open and inner.count(1) == 4:
+        return "open_four"
+    if sub_has(4, 1):
+        return "four"
+    if ends_open and inner.count(1) == 3 and inner.count(EMPTY) == 1:
+        return "open_three"
+    if sub_has(3, 2):
+        return "three"
+    if ends_open and inner.count(1) == 2 and inner.count(EMPTY) == 2:
+        return "open_two"
+    if sub_has(2, 3):
+        return "two"
+    if sub_has(1, 4):
+        return "one"
+    return None
+
+def _build_shape_tables():
+    """SHAPE_TABLE[player][code]: score of a window code for that player"""
+    size = 4 ** _SHAPE_WIDTH
+    tables = {AI: [0] * size, HUMAN: [0] * size}
+    swap = (0, 2, 1, _WALL)
+    for code in range(size):
+        cells = tuple((code >> (2 * k)) & 3 for k in range(_SHAPE_WIDTH))
+        shape = classify_shape(cells)
+        tables[AI][code] = ADVANCED_SCORES[shape] if shape else 0
+        shape = classify_shape(tuple(swap[v] for v in cells))
+        tables[HUMAN][code] = ADVANCED_SCORES[shape] if shape else 0
+    return tables
+
+SHAPE_TABLE = _build_shape_tables()
+_SHAPE_DIGIT = {AI: 1, HUMAN: 2}
+
+_shape_window_tables = {}
+
+def shape_windows(n):
+    """
+    Precompute the 6-cell windows of an n x n board for ShapeEvaluator
+
+    Lines are padded with one off-board cell at each end, so shapes
+    against the edge are seen as blocked. Returns (base_codes, members)
+    where base_codes[w] is the code of window w on an empty board and
+    members[i] lists (w, weight) for the windows containing cell i, weight
+    being 4 ** (position of i in w).
+    """
+    tables = _shape_window_tables.get(n)
+    if tables is not None:
+        return tables
+    base_codes = []
+    members = [[] for _ in range(n * n)]
+    dirs = [(0,1),(1,0),(1,1),(1,-1)]
+    for dr,dc in dirs:
+        for r in range(n):
+            for c in range(n):
+                if in_bounds(n, r - dr, c - dc):
+                    continue  # not the start of a line
+                line = [-1]
+                rr, cc = r, c
+                while in_bounds(n, rr, cc):
+                    line.append(rr * n + cc)
+                    rr += dr
+                    cc += dc
+                line.append(-1)
+                if len(line) < 7:
+                    continue  # too short to ever hold five
+                for s in range(len(line) - _SHAPE_WIDTH + 1):
+                    w = len(base_codes)
+                    code = 0
+                    for k, i in enumerate(line[s:s + _SHAPE_WIDTH]):
+                        if i < 0:
+                            code += _WALL << (2 * k)
+                        else:
+                            members[i].append((w, 1 << (2 * k)))
+                    base_codes.append(code)
+    tables = (base_codes, members)
+    _shape_window_tables[n] = tables
+    return tables
+
+class ShapeEvaluator:
+    """
+    Incremental shape scores for the "Advanced" and "Dynamic" evaluators
+
+    Every 6-cell window is kept as a base-4 code; a stone changes the code
+    of the windows through its cell by one addition, and the running
+    totals by two lookups in SHAPE_TABLE per window.
+    Attach it with shape_evaluator(board).
+    """
+
+    def __init__(self, board):
+        n = board.n
+        self.n = n
+        base_codes, self.members = shape_windows(n)
+        self.codes = list(base_codes)
+        self.totals = {
+            AI: sum(SHAPE_TABLE[AI][code] for code in base_codes),
+            HUMAN: sum(SHAPE_TABLE[HUMAN][code] for code in base_codes),
+        }
+        self.center = {AI: 0, HUMAN: 0}
+        for r, c, player in board.move_history:
+            self.on_place(r, c, player)
+
+    def _update(self, r, c, player, sign):
+        digit = sign * _SHAPE_DIGIT[player]
+        codes = self.codes
+        ai_table = SHAPE_TABLE[AI]
+        human_table = SHAPE_TABLE[HUMAN]
+        ai_total = self.totals[AI]
+        human_total = self.totals[HUMAN]
+        for w, weight in self.members[r * self.n + c]:
+            old = codes[w]
+            new = old + digit * weight
+            codes[w] = new
+            ai_total += ai_table[new] - ai_table[old]
+            human_total += human_table[new] - human_table[old]
+        self.totals[AI] = ai_total
+        self.totals[HUMAN] = human_total
+        center = self.n // 2
+        self.center[player] += sign * max(0, 10 - (abs(r - center) + abs(c - center)))
+
+    def on_place(self, r, c, player):
+        self._update(r, c, player, 1)
+
+    def on_remove(self, r, c, player):
+        self._update(r, c, player, -1)
+
+def shape_evaluator(board):
+    """Return the ShapeEvaluator attached to board, attaching one if needed"""
+    ev = board.listeners.get('shapes')
+    if ev is None:
+        ev = board.attach('shapes', ShapeEvaluator(board))
+    return ev
+
+def shape_totals(board):
+    """Full-scan version of ShapeEvaluator.totals"""
+    base_codes, members = shape_windows(board.n)
+    codes = list(base_codes)
+    n = board.n
+    g = board.grid
+    for i, windows in enumerate(members):
+        player = g[i // n][i % n]
+        if player != EMPTY:
+            digit = _SHAPE_DIGIT[player]
+            for w, weight in windows:
+                codes[w] += digit * weight
+    return {AI: sum(SHAPE_TABLE[AI][code] for code in codes),
+            HUMAN: sum(SHAPE_TABLE[HUMAN][code] for code in codes)}
+
+def _advanced_score(board, totals, center):
+    if board.winner == AI:
+        return 10**9
+    if board.winner == HUMAN:
+        return -10**9
+    return totals[AI] - totals[HUMAN] + (center[AI] - center[HUMAN]) * 5
+
+def heuristic3(board):
+    """Advanced: broken and open shapes in 6-cell windows, AI minus HUMAN"""
+    ev = shape_evaluator(board)
+    return _advanced_score(board, ev.totals, ev.center)
+
+def heuristic3_full(board):
+    center = {AI: center_control_bonus(board, AI), HUMAN: center_control_bonus(board, HUMAN)}
+    return _advanced_score(board, shape_totals(board), center)
+
+# Moves after which the "Dynamic" evaluator treats the game as fully
+# developed: the centre stops mattering and defence weighs 1.5x
+DYNAMIC_PHASE_MOVES = 40
+DYNAMIC_CENTER_WEIGHT = 10
+
+def _dynamic_score(board, totals, center):
+    if board.winner == AI:
+        return 10**9
+    if board.winner == HUMAN:
+        return -10**9
+    phase = min(1.0, board.move_count / DYNAMIC_PHASE_MOVES)
+    score = totals[AI] - int(totals[HUMAN] * (1 + phase / 2))
+    score += int((1 - phase) * DYNAMIC_CENTER_WEIGHT * (center[AI] - center[HUMAN]))
+    return score
+
+def heuristic4(board):
+    """Dynamic: Advanced shapes weighted by game phase"""
+    ev = shape_evaluator(board)
+    return _dynamic_score(board, ev.totals, ev.center)
+
+def heuristic4_full(board):
+    center = {AI: center_control_bonus(board, AI), HUMAN: center_control_bonus(board, HUMAN)}
+    return _dynamic_score(board, shape_totals(board), center)
+
+def heuristic2_full(board):
+    """Full-scan version of heuristic2"""
+    if board.winner == AI:
+        return 10**9
+    if board.winner == HUMAN:
+        return -10**9
+    score = 0
+    score += evaluate_board_by_lines(board, AI)
+    score -= evaluate_board_by_lines(board, HUMAN)
+    score += center_control_bonus(board, AI) * 5
+    score -= center_control_bonus(board, HUMAN) * 5
+    return score
+
+class Evaluator:
+    """
+    A registered position evaluation (positive is good for AI)
+
+    full(board) scans the whole board. incremental(board), when given,
+    returns the same value from state a Board listener keeps up to date
+    on every move; evaluate() uses it whenever it exists.
+    """
+
+    def __init__(self, mode, name, full, incremental=None, description=""):
+        self.mode = mode
+        self.name = name
+        self.full = full
+        self.incremental = incremental
+        self.description = description
+
+    @property
+    def is_incremental(self):
+        return self.incremental is not None
+
+    def evaluate(self, board):
+        if self.incremental is not None:
+            return self.incremental(board)
+        return self.full(board)
+
+    def __repr__(self):
+        return f"Evaluator({self.mode}, {self.name!r}, incremental={self.is_incremental})"
+
+EVALUATORS = {}
+DEFAULT_MODE = 2
+
+def register_evaluator(mode, name, full, incremental=None, description=""):
+    """Make an evaluator available as heuristic mode `mode` (AIPlayer, GUI)"""
+    EVALUATORS[mode] = Evaluator(mode, name, full, incremental, description)
+    return EVALUATORS[mode]
+
+def get_evaluator(mode):
+    """Evaluator for mode (unknown modes get the default "Pattern" one)"""
+    return EVALUATORS.get(mode) or EVALUATORS[DEFAULT_MODE]
+
+register_evaluator(1, "Simple", heuristic1,
+                   description="stone count and neighbour contact")
+register_evaluator(2, "Pattern", heuristic2_full, heuristic2,
+                   description="SCORES over 5-cell windows and centre control")
+register_evaluator(3, "Advanced", heuristic3_full, heuristic3,
+                   description="open and broken threes/fours in 6-cell windows")
+register_evaluator(4, "Dynamic", heuristic4_full, heuristic4,
+                   description="Advanced shapes weighted by game phase")
@@ -1,58 +1,89 @@
 # ai/minimax.py
 import math
 import time
-from ai.heuristics import heuristic1, heuristic2, EMPTY, AI, HUMAN
-TT = {}
-
-def board_to_key(board):
-    return ''.join(str(cell) for row in board.grid for cell in row)
-
-def generate_moves_nearby(board, radius=3):
-    n = board.n
-    g = board.grid
-    moves = set()
-    any_piece = False
-    for r in range(n):
-        for c in range(n):
-            if g[r][c] != 0:
-                any_piece = True
-                for dr in range(-radius, radius+1):
-                    for dc in range(-radius, radius+1):
-                        nr, nc = r+dr, c+dc
-                        if 0 <= nr < n and 0 <= nc < n and g[nr][nc] == 0:
-                            moves.add((nr,nc))
-    if not any_piece:
-        return [(n//2, n//2)]
-    return list(moves)
-
-def order_moves(board, moves, player, mode):
-    scored = []
-    for (r,c) in moves:
-        board.make_move(r,c, player)
-        if mode == 1:
-            s = heuristic1(board)
-        else:
-            s = heuristic2(board)
-        board.undo_move(r,c)
-        scored.append((s, (r,c)))
+from ai.heuristics import get_evaluator, local_threat_score, EMPTY, AI, HUMAN
+from ai.transposition import EXACT, LOWER, UPPER
+from ai.time_manager import TimeManager, SearchTimeout
+from game.board import symmetry_cell, inverse_symmetry_cell
+from game.game_state import GameState
+
+# Mixed into the key so the same stones with a different side to move
+# never share an entry
+MAXIMIZING_KEY = 0x9E3779B97F4A7C15
+
+# Scores at least this large mean a won or lost position
+WIN_SCORE = 10**8
+# Aspiration window: score of two plies earlier +- max(ASPIRATION_MIN, |score| * share)
+ASPIRATION_MIN = 100
+ASPIRATION_SHARE = 0.5
+MAX_PV_LENGTH = 16
+
+def board_to_key(board, maximizing=False):
+    # Symmetric positions share one key (see Board.canonical_hash)
+    key = board.canonical_hash()[0]
+    return key ^ MAXIMIZING_KEY if maximizing else key
+
+def to_tt_move(board, move, sym):
+    # Moves are stored in the canonical frame of the key...
+    return None if move is None else symmetry_cell(move[0], move[1], board.n, sym)
+
+def from_tt_move(board, move, sym):
+    # ...and mapped back to the board's orientation when read
+    return None if move is None else inverse_symmetry_cell(move[0], move[1], board.n, sym)
+
+def generate_moves_nearby(board):
+    # Shares Board's candidate frontier (see Board.radius)
+    if board.move_count == 0:
+        return [(board.n//2, board.n//2)]
+    return sorted(board.candidates)
+
+def order_moves(board, moves, player, mode=None):
+    # Stateless ordering by local threat score; the search uses a
+    # MoveOrderer (TT move, killers, history) when one is passed in
+    scored = [(local_threat_score(board, r, c, player), (r,c)) for (r,c) in moves]
     scored.sort(reverse=True, key=lambda x: x[0])
     return [m for _, m in scored]
 
 def evaluate(board, mode, maximizing_player):
-    if mode == 1:
-        return heuristic1(board)
-    else:
-        return heuristic2(board)
+    # Incremental evaluators read their Board listener, the others scan
+    return get_evaluator(mode).evaluate(board)
 
-def minimax(board, depth, alpha, beta, maximizing, mode, start_time=None, time_limit=None):
-    if start_time and time_limit and (time.time() - start_time) > time_limit:
-        return evaluate(board, mode, maximizing), None
+def minimax(board, depth, alpha, beta, maximizing, mode, clock=None, tt=None, orderer=None, ply=0,
+            stats=None):
+    # clock (a TimeManager) raises SearchTimeout when time is up; the
+    # board is restored on the way out and nothing partial is stored
+    if stats is not None:
+        stats.nodes += 1
+    if clock is not None:
+        clock.check()
 
-    key = board_to_key(board)
-    if key in TT and TT[key]['depth'] >= depth:
-        return TT[key]['val'], TT[key]['move']
+    key, sym = board.canonical_hash()
+    if maximizing:
+        key ^= MAXIMIZING_KEY
+    alpha_orig, beta_orig = alpha, beta
+    tt_move = None
+    if tt is not None:
+        entry = tt.probe(key)
+        if stats is not None:
+            stats.tt_probes += 1
+            if entry is not None:
+                stats.tt_hits += 1
+        if entry is not None:
+            tt_move = from_tt_move(board, entry[3], sym)
+        if entry is not None and entry[0] >= depth:
+            _, flag, val, _ = entry
+            if flag == EXACT:
+                return val, tt_move
+            if flag == LOWER:
+                alpha = max(alpha, val)
+            else:
+                beta = min(beta, val)
+            if beta <= alpha:
+                return val, tt_move
 
-    if depth == 0 or board.check_winner(AI) or board.check_winner(HUMAN):
+    if depth == 0 or board.winner is not None:
+        if stats is not None:
+            stats.leaf_evals += 1
         val = evaluate(board, mode, maximizing)
         return val, None
 
@@ -61,44 +92,261 @@ def minimax(board, depth, alpha, beta, maximizing, mode, start_time=None, time_l
     if not moves:
         return 0, None
 
-    moves = order_moves(board, moves, player, mode)
+    if orderer is not None:
+        moves = orderer.order(board, moves, player, ply, tt_move)
+    else:
+        moves = order_moves(board, moves, player, mode)
 
     best_move = None
     if maximizing:
         value = -math.inf
-        for (r,c) in moves:
+        for i, (r,c) in enumerate(moves):
             board.make_move(r,c, player)
-            val, _ = minimax(board, depth-1, alpha, beta, False, mode, start_time, time_limit)
-            board.undo_move(r,c)
+            try:
+                if i == 0 or depth == 1 or alpha == -math.inf:
+                    val, _ = minimax(board, depth-1, alpha, beta, False, mode, clock, tt, orderer,
+                                     ply+1, stats)
+                else:
+                    # PVS: a null window only checks the move can't beat
+                    # alpha; search it properly if it can
+                    val, _ = minimax(board, depth-1, alpha, alpha+1, False, mode, clock, tt,
+                                     orderer, ply+1, stats)
+                    if alpha < val < beta:
+                        if stats is not None:
+                            stats.researches += 1
+                        val, _ = minimax(board, depth-1, alpha, beta, False, mode, clock, tt,
+                                         orderer, ply+1, stats)
+            finally:
+                board.undo_move(r,c)
             if val > value:
                 value = val
                 best_move = (r,c)
+                if ply == 0 and clock is not None:
+                    # Fallback if the search is cut short
+                    clock.root_best = best_move
             alpha = max(alpha, value)
             if beta <= alpha:
+                if orderer is not None:
+                    orderer.record_cutoff((r,c), player, depth, ply)
+                if stats is not None:
+                    stats.record_cutoff(i)
                 break
     else:
         value = math.inf
-        for (r,c) in moves:
+        for i, (r,c) in enumerate(moves):
             board.make_move(r,c, player)
-            val, _ = minimax(board, depth-1, alpha, beta, True, mode, start_time, time_limit)
-            board.undo_move(r,c)
+            try:
+                if i == 0 or depth == 1 or beta == math.inf:
+                    val, _ = minimax(board, depth-1, alpha, beta, True, mode, clock, tt, orderer,
+                                     ply+1, stats)
+                else:
+                    val, _ = minimax(board, depth-1, beta-1, beta, True, mode, clock, tt,
+                                     orderer, ply+1, stats)
+                    if alpha < val < beta:
+                        if stats is not None:
+                            stats.researches += 1
+                        val, _ = minimax(board, depth-1, alpha, beta, True, mode, clock, tt,
+                                         orderer, ply+1, stats)
+            finally:
+                board.undo_move(r,c)
             if val < value:
                 value = val
                 best_move = (r,c)
             beta = min(beta, value)
             if beta <= alpha:
+                if orderer is not None:
+                    orderer.record_cutoff((r,c), player, depth, ply)
+                if stats is not None:
+                    stats.record_cutoff(i)
                 break
 
-    TT[key] = {'val': value, 'move': best_move, 'depth': depth}
+    if tt is not None:
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, flag, value, to_tt_move(board, best_move, sym))
+        if stats is not None:
+            stats.tt_stores += 1
     return value, best_move
 
-def iterative_deepening(board, max_depth, mode, time_limit=5.0):
-    start = time.time()
+def principal_variation(board, tt, max_length=MAX_PV_LENGTH):
+    """
+    Expected line of play from board (AI to move), read from the table
+
+    Follows the stored best moves, alternating AI and HUMAN, until an
+    entry is missing or the game ends. board is restored afterwards.
+    """
+    return principal_variation_from(board, tt, True, max_length)
+
+def principal_variation_from(board, tt, maximizing, max_length=MAX_PV_LENGTH):
+    # principal_variation with either side to move
+    pv = []
+    try:
+        while len(pv) < max_length and board.winner is None:
+            key, sym = board.canonical_hash()
+            if maximizing:
+                key ^= MAXIMIZING_KEY
+            move = from_tt_move(board, tt.best_move(key), sym)
+            if move is None or not board.is_valid_move(*move):
+                break
+            board.make_move(move[0], move[1], AI if maximizing else HUMAN)
+            pv.append(move)
+            maximizing = not maximizing
+    finally:
+        for _ in pv:
+            board.undo_move()
+    return pv
+
+def _aspiration_window(score):
+    if abs(score) >= WIN_SCORE:
+        return -math.inf, math.inf
+    margin = max(ASPIRATION_MIN, abs(score) * ASPIRATION_SHARE)
+    return score - margin, score + margin
+
+def iterative_deepening(board, max_depth, mode, time_limit=5.0, tt=None, orderer=None, stop_event=None,
+                        stats=None):
+    # Only completed iterations count: an interrupted one is thrown away,
+    # and a depth is not started when it is predicted not to fit.
+    # Each depth first searches a window around the score of two plies
+    # earlier (odd and even depths end on different sides and their
+    # scores swing) and only repeats with the full window when the score
+    # falls outside it.
+    clock = TimeManager(time_limit, stop_event)
     best = None
+    scores = []
     for d in range(1, max_depth+1):
-        val, move = minimax(board, d, -math.inf, math.inf, True, mode, start, time_limit)
+        if d > 1 and not clock.next_iteration_fits():
+            break
+        iteration_start = time.time()
+        alpha, beta = (-math.inf, math.inf) if d <= 2 else _aspiration_window(scores[-2])
+        try:
+            val, move = minimax(board, d, alpha, beta, True, mode, clock, tt, orderer,
+                                stats=stats)
+            if val <= alpha or val >= beta:
+                if stats is not None:
+                    stats.researches += 1
+                val, move = minimax(board, d, -math.inf, math.inf, True, mode, clock, tt, orderer,
+                                    stats=stats)
+        except SearchTimeout:
+            break
+        seconds = time.time() - iteration_start
+        clock.finish_iteration(seconds)
+        scores.append(val)
+        if stats is not None:
+            stats.finish_iteration(d, seconds)
+            if tt is not None:
+                stats.pv = principal_variation(board, tt, d)
         if move is not None:
             best = move
-        if time.time() - start > time_limit:
-            break
     return best
+
+def _search_root_chunk(state, moves, max_depth, mode, time_limit, iterative, seed_entries, tt_size_mb):
+    # Runs in a worker process: rebuild the position from its GameState,
+    # then alpha-beta over this worker's share of the root moves with a
+    # private table seeded from the parent's.
+    from ai.transposition import TranspositionTable
+    from ai.move_ordering import MoveOrderer
+    from ai.search_stats import SearchStats
+
+    board = state.to_board()
+    tt = TranspositionTable(tt_size_mb)
+    tt.merge(seed_entries)
+    orderer = MoveOrderer()
+    stats = SearchStats()
+    clock = TimeManager(time_limit)
+
+    best = (-math.inf, None)
+    first_depth = 1 if iterative else max_depth
+    for d in range(first_depth, max_depth+1):
+        if d > first_depth and not clock.next_iteration_fits():
+            break
+        iteration_start = time.time()
+        alpha = -math.inf
+        best_val, best_move = -math.inf, None
+        completed = True
+        for (r,c) in moves:
+            board.make_move(r,c, AI)
+            try:
+                val, _ = minimax(board, d-1, alpha, math.inf, False, mode, clock, tt, orderer, 1,
+                                 stats=stats)
+            except SearchTimeout:
+                completed = False
+                break
+            finally:
+                board.undo_move()
+            if val > best_val:
+                best_val, best_move = val, (r,c)
+            alpha = max(alpha, best_val)
+        if not completed:
+            # Keep the moves searched so far only if no iteration finished
+            if best[1] is None and best_move is not None:
+                best = (best_val, best_move)
+            break
+        seconds = time.time() - iteration_start
+        clock.finish_iteration(seconds)
+        stats.finish_iteration(d, seconds)
+        best = (best_val, best_move)
+    return best, tt.export(min_depth=2), stats
+
+def parallel_search(board, max_depth, mode, executor, workers, time_limit=None, tt=None,
+                    iterative=False, tt_size_mb=16, stats=None):
+    """
+    Root-split search: the ordered root moves are dealt round-robin to
+    workers processes, each searching its share with alpha-beta. Results
+    are merged in a fixed order (best score, then earliest root move), so
+    the chosen move does not depend on worker scheduling unless the time
+    limit cuts a search short. Deep entries from the workers' tables are
+    merged back into tt, which also seeds the next search. Worker
+    counters are summed into stats; an iteration counts as completed
+    when every worker finished it, and takes as long as the slowest one.
+    """
+    moves = generate_moves_nearby(board)
+    if not moves:
+        return None
+    moves = order_moves(board, moves, AI, mode)
+    if tt is not None:
+        key, sym = board.canonical_hash()
+        tt_move = from_tt_move(board, tt.best_move(key ^ MAXIMIZING_KEY), sym)
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+    workers = max(1, min(workers, len(moves)))
+    seed_entries = tt.export(min_depth=2) if tt is not None else []
+    state = GameState.from_board(board)
+    futures = [
+        executor.submit(_search_root_chunk, state, moves[i::workers], max_depth,
+                        mode, time_limit, iterative, seed_entries, tt_size_mb)
+        for i in range(workers)
+    ]
+
+    index = {m: i for i, m in enumerate(moves)}
+    best_val, best_move = -math.inf, None
+    iterations = []
+    for future in futures:
+        (val, move), entries, worker_stats = future.result()
+        if tt is not None:
+            tt.merge(entries)
+        if stats is not None:
+            stats.merge(worker_stats)
+            iterations.append(list(zip(worker_stats.depths, worker_stats.iteration_times)))
+        if move is None:
+            continue
+        if val > best_val or (val == best_val and index[move] < index[best_move]):
+            best_val, best_move = val, move
+    if iterations:
+        for per_worker in zip(*iterations):
+            stats.finish_iteration(per_worker[0][0], max(t for _, t in per_worker))
+    if stats is not None and tt is not None and best_move is not None:
+        # The root entry may come from any worker's share; start the line
+        # from the chosen move
+        board.make_move(best_move[0], best_move[1], AI)
+        try:
+            line = principal_variation_from(board, tt, False, max_depth - 1)
+        finally:
+            board.undo_move()
+        stats.pv = [best_move] + line
+    return best_move
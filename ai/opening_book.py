@@ -0,0 +1,218 @@
+# ai/opening_book.py
+"""
+Opening book: best AI moves for early positions, searched offline
+
+The book is a flat binary file of fixed-size records sorted by key and
+read through mmap, so loading it costs nothing and lookups are a binary
+search. Positions are keyed by Board.canonical_hash(), so one record
+serves all 8 symmetric versions of a position; moves are stored in the
+canonical frame and mapped back on lookup. Every record also holds the
+heuristic mode it was searched with, and a player only uses the records
+of its own mode.
+
+Build it with:
+    python -m ai.opening_book --sizes 15 --modes 3 4 --stones 4 --depth 5 --time 20
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import warnings
+
+from ai.heuristics import AI, HUMAN
+from ai.minimax import iterative_deepening, generate_moves_nearby, order_moves, board_to_key
+from ai.move_ordering import MoveOrderer
+from ai.transposition import TranspositionTable
+from game.board import Board, symmetry_cell, inverse_symmetry_cell
+
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(__file__), "opening_book.bin")
+
+BOOK_MAGIC = b"GMKB"
+BOOK_VERSION = 2
+# magic, version, record count
+_HEADER = struct.Struct("<4sHI")
+# key, board size, heuristic mode, row, col, search depth, score
+_RECORD = struct.Struct("<QBBBBBi")
+
+_SCORE_LIMIT = 2 ** 31 - 1
+
+
+class OpeningBook:
+    """Read-only view of a book file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = None, None, 0
+        if len(self._data) >= _HEADER.size:
+            magic, version, count = _HEADER.unpack_from(self._data)
+        if (magic != BOOK_MAGIC or version != BOOK_VERSION
+                or len(self._data) != _HEADER.size + count * _RECORD.size):
+            self._data.close()
+            raise ValueError(f"{path} is not an opening book (version {BOOK_VERSION})")
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, i):
+        return _RECORD.unpack_from(self._data, _HEADER.size + i * _RECORD.size)
+
+    def probe(self, key, n, mode):
+        """Return (row, col, depth, score) in the canonical frame, or None"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[:3] < (key, n, mode):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            k, size, m, r, c, depth, score = self._record(lo)
+            if k == key and size == n and m == mode:
+                return r, c, depth, score
+        return None
+
+    def lookup(self, board, mode):
+        """Book move for an AI searching with mode on board (board orientation), or None"""
+        key, t = board.canonical_hash()
+        entry = self.probe(key, board.n, mode)
+        if entry is None:
+            return None
+        r, c = inverse_symmetry_cell(entry[0], entry[1], board.n, t)
+        if not board.is_valid_move(r, c):
+            return None
+        return r, c
+
+    def close(self):
+        self._data.close()
+
+
+_books = {}
+
+
+def load_book(path=OPENING_BOOK_PATH):
+    """
+    Open the book at path once per process and share it
+
+    Returns:
+        OpeningBook, or None if the file does not exist or cannot be
+        used (empty, damaged or from another BOOK_VERSION)
+    """
+    if path not in _books:
+        book = None
+        if os.path.exists(path):
+            try:
+                book = OpeningBook(path)
+            except (OSError, ValueError) as e:
+                warnings.warn(f"Opening book {path} not used: {e}")
+        _books[path] = book
+    return _books[path]
+
+
+def write_book(path, entries):
+    """
+    Write entries {(key, n, mode): (row, col, depth, score)} as a book file
+
+    The file is written next to path and renamed into place, so readers
+    never see a partial book.
+    """
+    records = sorted(entries.items())
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, len(records)))
+        for (key, n, mode), (r, c, depth, score) in records:
+            score = max(-_SCORE_LIMIT, min(_SCORE_LIMIT, int(score)))
+            f.write(_RECORD.pack(key, n, mode, r, c, depth, score))
+    os.replace(tmp, path)
+
+
+def build_book(n, max_stones, depth, time_limit, width, mode=2, entries=None, log=None):
+    """
+    Search the opening tree of an n x n board
+
+    AI-to-move positions get one deep search and continue with the book
+    move only; at HUMAN-to-move positions the `width` best replies by
+    threat score are followed. Both "AI first" and "HUMAN first" games
+    are covered, up to max_stones stones on the board.
+
+    Returns:
+        dict: {(key, n, mode): (row, col, depth, score)} (entries, if given, is
+        extended in place)
+    """
+    if entries is None:
+        entries = {}
+    seen = set()
+    tt = TranspositionTable()
+    orderer = MoveOrderer()
+
+    def visit(board):
+        if board.move_count >= max_stones or board.winner is not None:
+            return
+        key, t = board.canonical_hash()
+        if (key, board.current_player) in seen:
+            return
+        seen.add((key, board.current_player))
+
+        if board.current_player == AI:
+            tt.new_search()
+            orderer.new_search()
+            start = time.time()
+            move = iterative_deepening(board, depth, mode, time_limit=time_limit, tt=tt,
+                                       orderer=orderer)
+            if move is None:
+                return
+            entry = tt.probe(board_to_key(board, True))
+            score = entry[2] if entry is not None else 0
+            r, c = symmetry_cell(move[0], move[1], board.n, t)
+            entries[(key, board.n, mode)] = (r, c, depth, score)
+            if log:
+                log(f"n={board.n} mode={mode} stones={board.move_count} move={move} "
+                    f"score={score} ({time.time() - start:.1f}s)")
+            board.make_move(move[0], move[1], AI)
+            visit(board)
+            board.undo_move()
+        else:
+            replies = order_moves(board, generate_moves_nearby(board), HUMAN)
+            for r, c in replies[:width]:
+                board.make_move(r, c, HUMAN)
+                visit(board)
+                board.undo_move()
+
+    for first in (AI, HUMAN):
+        board = Board(n)
+        board.current_player = first
+        visit(board)
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Gomoku opening book")
+    parser.add_argument("--output", default=OPENING_BOOK_PATH)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15])
+    parser.add_argument("--stones", type=int, default=4,
+                        help="deepest position in the book, in stones on the board")
+    parser.add_argument("--depth", type=int, default=5, help="search depth per position")
+    parser.add_argument("--time", type=float, default=20.0, help="seconds per position")
+    parser.add_argument("--width", type=int, default=3,
+                        help="HUMAN replies followed at each HUMAN-to-move position")
+    parser.add_argument("--modes", type=int, nargs="+", default=[3, 4],
+                        help="heuristic modes to search with (the presets using the book)")
+    args = parser.parse_args(argv)
+
+    entries = {}
+    for n in args.sizes:
+        for mode in args.modes:
+            build_book(n, args.stones, args.depth, args.time, args.width, mode, entries,
+                       log=lambda msg: print(msg, file=sys.stderr))
+    write_book(args.output, entries)
+    print(f"Wrote {len(entries)} positions to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
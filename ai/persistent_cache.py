@@ -0,0 +1,137 @@
+# ai/persistent_cache.py
+"""
+Search results kept on disk between sessions
+
+Transposition table entries (canonical position key, depth, bound,
+score, best move) are written to a SQLite file in one batch when a game
+ends and loaded back into the next game's table, so positions searched
+before - typically the openings - are answered from the table.
+"""
+
+import hashlib
+import sqlite3
+import time
+
+from ai.heuristics import SCORES, ADVANCED_SCORES, DYNAMIC_PHASE_MOVES, DYNAMIC_CENTER_WEIGHT
+from ai.minimax import MAXIMIZING_KEY
+from game.board import ZOBRIST_SEED
+
+CACHE_PATH = "gomoku_cache.sqlite"
+CACHE_MAX_ENTRIES = 500000
+# Shallow entries are cheap to recompute and not worth the disk space
+CACHE_MIN_DEPTH = 2
+
+# Bumped whenever stored values change meaning (2: real modes 3 and 4)
+_FORMAT = 2
+
+
+def cache_version():
+    """
+    Stamp of everything the stored values depend on
+
+    Changing the evaluators' constants, the Zobrist seed or the key
+    layout changes the stamp, and a cache with another stamp is emptied
+    when opened.
+    """
+    text = repr((_FORMAT, sorted(SCORES.items()), sorted(ADVANCED_SCORES.items()),
+                 DYNAMIC_PHASE_MOVES, DYNAMIC_CENTER_WEIGHT, ZOBRIST_SEED, MAXIMIZING_KEY))
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _to_signed(key):
+    # SQLite integers are signed 64-bit
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+def _to_unsigned(key):
+    return key + (1 << 64) if key < 0 else key
+
+
+class PersistentCache:
+    """
+    SQLite store of transposition entries, per board size and heuristic
+
+    Rows are stamped with the time they were last written; when the file
+    holds more than max_entries rows the least recently written ones are
+    dropped.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, timeout=10)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS entries (
+                key INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                mode INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                flag INTEGER NOT NULL,
+                value REAL NOT NULL,
+                move INTEGER NOT NULL,
+                used REAL NOT NULL,
+                PRIMARY KEY (key, n, mode)
+            );
+            CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+        """)
+        self._check_version()
+
+    def _check_version(self):
+        version = cache_version()
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != version:
+            with self.conn:
+                self.conn.execute("DELETE FROM entries")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def load(self, n, mode, limit):
+        """
+        Most recently written entries for this board size and heuristic
+
+        Returns:
+            list: [(key, depth, flag, value, packed_move), ...] as used by
+            TranspositionTable.merge()
+        """
+        rows = self.conn.execute(
+            "SELECT key, depth, flag, value, move FROM entries WHERE n = ? AND mode = ? "
+            "ORDER BY used DESC LIMIT ?", (n, mode, limit))
+        return [(_to_unsigned(key), depth, flag, value, move)
+                for key, depth, flag, value, move in rows]
+
+    def save(self, n, mode, entries):
+        """
+        Write TranspositionTable.export() entries in one transaction
+
+        An existing row is only replaced by a result searched at least as
+        deep; either way it is marked as recently used.
+        """
+        now = time.time()
+        rows = [(_to_signed(key), n, mode, depth, flag, value, move, now)
+                for key, depth, flag, value, move in entries]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key, n, mode) DO UPDATE SET
+                    depth = excluded.depth, flag = excluded.flag,
+                    value = excluded.value, move = excluded.move
+                    WHERE excluded.depth >= entries.depth
+            """, rows)
+            self.conn.executemany(
+                "UPDATE entries SET used = ? WHERE key = ? AND n = ? AND mode = ?",
+                [(now, row[0], n, mode) for row in rows])
+            self._evict()
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY used LIMIT ?)",
+                (count - self.max_entries,))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
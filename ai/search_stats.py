@@ -0,0 +1,82 @@
+# ai/search_stats.py
+import time
+
+
+class SearchStats:
+    """
+    Counters collected during one AI search
+
+    Filled in by minimax / iterative_deepening / parallel_search when
+    passed as stats=..., and exposed as AIPlayer.last_stats.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_stores = 0
+        self.researches = 0        # PVS / aspiration re-searches
+        self.cutoffs = {}          # move index -> number of beta cutoffs
+        self.depths = []           # depth completed by each iteration
+        self.iteration_times = []  # seconds spent on each iteration
+        self.pv = []               # principal variation of the last iteration
+        self.start_time = time.time()
+        self.elapsed = 0.0
+
+    def record_cutoff(self, index):
+        self.cutoffs[index] = self.cutoffs.get(index, 0) + 1
+
+    def finish_iteration(self, depth, seconds):
+        self.depths.append(depth)
+        self.iteration_times.append(seconds)
+
+    def stop(self):
+        self.elapsed = time.time() - self.start_time
+        return self
+
+    def merge(self, other):
+        """Add the counters of another SearchStats (e.g. from a worker)"""
+        self.nodes += other.nodes
+        self.leaf_evals += other.leaf_evals
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.tt_stores += other.tt_stores
+        self.researches += other.researches
+        for index, count in other.cutoffs.items():
+            self.cutoffs[index] = self.cutoffs.get(index, 0) + count
+
+    @property
+    def depth(self):
+        return max(self.depths) if self.depths else 0
+
+    @property
+    def nps(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Share of cutoffs produced by the first move tried (ordering quality)"""
+        total = sum(self.cutoffs.values())
+        return self.cutoffs.get(0, 0) / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "leaf_evals": self.leaf_evals,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_stores": self.tt_stores,
+            "researches": self.researches,
+            "cutoffs": dict(sorted(self.cutoffs.items())),
+            "depths": list(self.depths),
+            "iteration_times": [round(t, 4) for t in self.iteration_times],
+            "depth": self.depth,
+            "elapsed": round(self.elapsed, 4),
+            "nps": round(self.nps, 1),
+            "pv": [list(move) for move in self.pv],
+        }
+
+    def __repr__(self):
+        return (f"SearchStats(depth={self.depth}, nodes={self.nodes}, "
+                f"nps={self.nps:.0f}, tt_hits={self.tt_hits}/{self.tt_probes})")
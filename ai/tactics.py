@@ -0,0 +1,69 @@
+# ai/tactics.py
+from ai.heuristics import pattern_evaluator, AI, HUMAN, EMPTY
+
+
+class TacticalReport:
+    """
+    Immediate tactical facts about a position, for both players
+
+    wins[p]        cells where p completes five
+    fours[p]       cells where p makes a four (threatens five)
+    open_fours[p]  cells where p makes two five-threats at once
+                   (open four or double four)
+    open_threes[p] cells where p makes a three with both window ends open
+
+    Cells are (row, col) tuples; all values are sets.
+    """
+
+    def __init__(self):
+        self.wins = {AI: set(), HUMAN: set()}
+        self.fours = {AI: set(), HUMAN: set()}
+        self.open_fours = {AI: set(), HUMAN: set()}
+        self.open_threes = {AI: set(), HUMAN: set()}
+
+    def blocks(self, player):
+        """Cells player must occupy to stop the opponent's five"""
+        return self.wins[-player]
+
+
+def scan_tactics(board):
+    """
+    Build a TacticalReport by walking every 5-cell window once
+
+    Window piece counts come from the board's PatternEvaluator, so the
+    pass only reads counts and the few empty cells of windows that matter.
+    """
+    ev = pattern_evaluator(board)
+    n = ev.n
+    cells = ev.cells
+    report = TacticalReport()
+    # four-making cell -> the cells it would threaten to complete
+    targets = {AI: {}, HUMAN: {}}
+
+    for w, (window, before, after) in enumerate(ev.windows):
+        for player in (AI, HUMAN):
+            if ev.count[-player][w]:
+                continue
+            k = ev.count[player][w]
+            if k < 2:
+                continue
+            empties = [i for i in window if cells[i] == EMPTY]
+            if k == 4:
+                report.wins[player].add(divmod(empties[0], n))
+            elif k == 3:
+                a, b = empties
+                t = targets[player]
+                t.setdefault(a, set()).add(b)
+                t.setdefault(b, set()).add(a)
+            elif (before >= 0 and cells[before] == EMPTY and
+                  after >= 0 and cells[after] == EMPTY):
+                for i in empties:
+                    report.open_threes[player].add(divmod(i, n))
+
+    for player in (AI, HUMAN):
+        for i, threatened in targets[player].items():
+            cell = divmod(i, n)
+            report.fours[player].add(cell)
+            if len(threatened) >= 2:
+                report.open_fours[player].add(cell)
+    return report
@@ -0,0 +1,106 @@
+# ai/threats.py
+import time
+from ai.heuristics import pattern_evaluator
+
+# Longest forcing sequence tried, in attacker moves
+VCF_MAX_DEPTH = 12
+
+
+class ThreatSearchTimeout(Exception):
+    pass
+
+
+def find_vcf(board, attacker, time_limit=None, max_depth=VCF_MAX_DEPTH, stop_event=None):
+    """
+    Victory by continuous fours: a sequence where every attacker move
+    threatens five, so each defender reply is forced, ending in a five
+    or in two threats at once (double four / open four).
+
+    Threats are read from the PatternEvaluator's window index, so each
+    node only looks at windows that already hold three or four stones.
+
+    Args:
+        board: position with attacker to move (searched in place and
+               restored before returning)
+        attacker: AI (1) or HUMAN (-1)
+        time_limit: seconds before giving up (None = no limit)
+        max_depth: maximum number of attacker moves
+
+    Returns:
+        list: the forcing line [(r, c), ...] alternating attacker and
+        defender moves, or None if no VCF was found in time
+    """
+    deadline = time.time() + time_limit if time_limit else None
+    search = _VCFSearch(board, attacker, deadline, stop_event)
+    moves_before = len(board.move_history)
+    try:
+        return search.run(max_depth)
+    except ThreatSearchTimeout:
+        while len(board.move_history) > moves_before:
+            board.undo_move()
+        return None
+
+
+class _VCFSearch:
+    def __init__(self, board, attacker, deadline, stop_event):
+        self.board = board
+        self.attacker = attacker
+        self.defender = -attacker
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.ev = pattern_evaluator(board)
+        self.failed = set()  # (hash, depth) already shown not to win
+        self.nodes = 0
+
+    def _check_time(self):
+        self.nodes += 1
+        if self.nodes & 63:
+            return
+        if self.deadline is not None and time.time() > self.deadline:
+            raise ThreatSearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise ThreatSearchTimeout()
+
+    def run(self, depth):
+        board = self.board
+        ev = self.ev
+        wins = ev.winning_cells(self.attacker)
+        if wins:
+            return [min(wins)]
+        if depth == 0:
+            return None
+        key = (board.hash, depth)
+        if key in self.failed:
+            return None
+        self._check_time()
+
+        candidates = ev.four_cells(self.attacker)
+        opp_wins = ev.winning_cells(self.defender)
+        if opp_wins:
+            # The defender threatens five: only a four on that cell keeps
+            # the initiative
+            if len(opp_wins) > 1:
+                return None
+            candidates &= opp_wins
+
+        for r, c in sorted(candidates):
+            board.make_move(r, c, self.attacker)
+            threats = ev.winning_cells(self.attacker)
+            line = None
+            if len(threats) >= 2:
+                # Two ways to make five: the defender can block only one
+                line = [(r, c)]
+            elif len(threats) == 1:
+                br, bc = next(iter(threats))
+                board.make_move(br, bc, self.defender)
+                if board.winner is None:
+                    rest = self.run(depth - 1)
+                    if rest is not None:
+                        line = [(r, c), (br, bc)] + rest
+                board.undo_move()
+            board.undo_move()
+            if line is not None:
+                return line
+
+        self.failed.add(key)
+        return None
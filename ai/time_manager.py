@@ -0,0 +1,90 @@
+# ai/time_manager.py
+import time
+
+# Nodes between two looks at the clock (time.time() is not free)
+CHECK_INTERVAL = 128
+
+# Assumed growth of the next iteration's time while only one iteration
+# has been timed, and the range the measured growth is clamped to
+DEFAULT_GROWTH = 4.0
+MIN_GROWTH = 1.5
+MAX_GROWTH = 12.0
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when time is up or the search is cancelled"""
+    pass
+
+
+class TimeManager:
+    """
+    Time budget of one search
+
+    minimax calls check() on every node; every CHECK_INTERVAL nodes it
+    reads the clock and raises SearchTimeout once the deadline has passed
+    or stop_event is set, so an interrupted search never returns a score
+    from a partial tree. Callers catch the exception and fall back to
+    the last completed iteration (or root_best, the best root move whose
+    subtree was searched completely).
+
+    Iteration times are recorded to predict whether the next, deeper
+    iteration can finish before the deadline.
+    """
+
+    def __init__(self, time_limit=None, stop_event=None, check_interval=CHECK_INTERVAL):
+        """
+        Args:
+            time_limit: seconds for the whole search (None = no limit)
+            stop_event: threading.Event that cancels the search when set
+            check_interval: nodes between clock checks
+        """
+        self.start = time.time()
+        self.time_limit = time_limit
+        self.deadline = self.start + time_limit if time_limit else None
+        self.stop_event = stop_event
+        self.check_interval = check_interval
+        self.nodes = 0
+        self.next_check = check_interval
+        self.iteration_times = []
+        self.root_best = None
+
+    def check(self):
+        """Count a node; raise SearchTimeout if the search must stop"""
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.next_check = self.nodes + self.check_interval
+            if self.expired():
+                raise SearchTimeout()
+
+    def expired(self):
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        return self.deadline is not None and time.time() > self.deadline
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def remaining(self):
+        if self.deadline is None:
+            return float("inf")
+        return self.deadline - time.time()
+
+    def finish_iteration(self, seconds):
+        self.iteration_times.append(seconds)
+
+    def next_iteration_fits(self):
+        """
+        Predict whether one more iteration finishes before the deadline
+
+        The next iteration is assumed to take the last one's time times
+        the growth between the last two (the effective branching factor).
+        """
+        if self.expired():
+            return False
+        if self.deadline is None or not self.iteration_times:
+            return True
+        times = self.iteration_times
+        growth = DEFAULT_GROWTH
+        if len(times) >= 2 and times[-2] > 0:
+            growth = min(MAX_GROWTH, max(MIN_GROWTH, times[-1] / times[-2]))
+        return times[-1] * growth <= self.remaining()
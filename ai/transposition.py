@@ -0,0 +1,128 @@
+# ai/transposition.py
+from array import array
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+NO_MOVE = -1
+
+# key(8) + value(8) + move(4) + depth(1) + flag(1) + age(1)
+ENTRY_BYTES = 23
+
+
+def pack_move(move):
+    if move is None:
+        return NO_MOVE
+    r, c = move
+    return (r << 8) | c
+
+
+def unpack_move(packed):
+    if packed == NO_MOVE:
+        return None
+    return (packed >> 8, packed & 0xFF)
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table stored in flat arrays.
+
+    Every bucket has two slots: slot 0 keeps the deepest result (unless it
+    belongs to an older search generation), slot 1 is always replaced.
+    Values are stored with a bound flag so the search only reuses them
+    when they are valid for the current alpha-beta window.
+    """
+
+    def __init__(self, size_mb=16):
+        entries = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        buckets = 1
+        while buckets * 4 <= entries:
+            buckets *= 2
+        self.mask = buckets - 1
+        self.size = buckets * 2
+        self.generation = 0
+        self._allocate()
+
+    def _allocate(self):
+        n = self.size
+        self.keys = array('Q', bytes(8 * n))
+        self.values = array('d', bytes(8 * n))
+        self.moves = array('i', [NO_MOVE]) * n
+        self.depths = array('b', [-1]) * n
+        self.flags = array('B', bytes(n))
+        self.ages = array('B', bytes(n))
+
+    def clear(self):
+        self.generation = 0
+        self._allocate()
+
+    def new_search(self):
+        """Start a new generation; entries from older ones get replaced first"""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def _find(self, key):
+        i = (key & self.mask) << 1
+        keys = self.keys
+        depths = self.depths
+        if keys[i] == key and depths[i] >= 0:
+            return i
+        if keys[i + 1] == key and depths[i + 1] >= 0:
+            return i + 1
+        return -1
+
+    def probe(self, key):
+        """
+        Look up a position
+
+        Returns:
+            tuple: (depth, flag, value, move) or None if not stored
+        """
+        i = self._find(key)
+        if i < 0:
+            return None
+        self.ages[i] = self.generation
+        return (self.depths[i], self.flags[i], self.values[i],
+                unpack_move(self.moves[i]))
+
+    def best_move(self, key):
+        i = self._find(key)
+        if i < 0:
+            return None
+        return unpack_move(self.moves[i])
+
+    def store(self, key, depth, flag, value, move):
+        i = (key & self.mask) << 1
+        depths = self.depths
+        if (depths[i] < 0 or self.keys[i] == key or depth >= depths[i]
+                or self.ages[i] != self.generation):
+            slot = i
+        else:
+            slot = i + 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.moves[slot] = pack_move(move)
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.ages[slot] = self.generation
+
+    def export(self, min_depth=0):
+        """
+        Return the stored entries as plain tuples (for other processes)
+
+        Returns:
+            list: [(key, depth, flag, value, packed_move), ...] for entries
+            searched to at least min_depth
+        """
+        keys, depths, flags, values, moves = (self.keys, self.depths, self.flags,
+                                              self.values, self.moves)
+        return [(keys[i], depths[i], flags[i], values[i], moves[i])
+                for i in range(self.size) if depths[i] >= min_depth]
+
+    def merge(self, entries):
+        """Store entries produced by export(), using the normal replacement rules"""
+        for key, depth, flag, value, packed in entries:
+            self.store(key, depth, flag, value, unpack_move(packed))
+
+    def __len__(self):
+        return sum(1 for d in self.depths if d >= 0)
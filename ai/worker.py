@@ -0,0 +1,73 @@
+# ai/worker.py
+import threading
+import time
+from game.game_state import GameState
+
+
+class SearchWorker:
+    """
+    Runs AIPlayer.get_best_move on a snapshot of the board in a daemon thread
+
+    Only a compact GameState is taken on the caller's thread; the board
+    the search works on is rebuilt inside the worker.
+
+    The caller polls done() (e.g. from Tk's after loop) and reads move /
+    move_time / error once it returns True. cancel() asks the search to
+    stop at its next node; a cancelled worker's result must be ignored.
+    """
+
+    def __init__(self, ai_player, board):
+        self.ai_player = ai_player
+        self.state = GameState.from_board(board)
+        self.stop_event = threading.Event()
+        self.move = None
+        self.move_time = 0.0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        start = time.time()
+        try:
+            board = self.state.to_board()
+            self.move = self.ai_player.get_best_move(board, stop_event=self.stop_event)
+        except Exception as e:
+            self.error = e
+        self.move_time = time.time() - start
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def cancel(self, wait=False, timeout=None):
+        """Ask the search to stop; with wait, join the thread (by default until it ends)"""
+        self.stop_event.set()
+        if wait and self.thread.is_alive():
+            self.thread.join(timeout)
+
+    @property
+    def cancelled(self):
+        return self.stop_event.is_set()
+
+
+class PonderWorker(SearchWorker):
+    """
+    Runs AIPlayer.ponder on a snapshot of the board (HUMAN to move) until
+    cancelled or finished
+
+    Nothing is polled: the results stay in the AI player (transposition
+    table and ponder_results). The same AIPlayer must not search again
+    before cancel(wait=True) has returned, since both share its table;
+    without a timeout it only returns once the thread has ended.
+    """
+
+    def _run(self):
+        start = time.time()
+        try:
+            board = self.state.to_board()
+            self.ai_player.ponder(board, self.stop_event)
+        except Exception as e:
+            self.error = e
+        self.move_time = time.time() - start
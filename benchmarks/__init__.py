@@ -0,0 +1,6 @@
+"""
+Reproducible benchmarks for the Gomoku AI engine
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json
+"""
@@ -0,0 +1,97 @@
+"""
+Benchmark position corpus
+
+Positions are described by move lists relative to the board centre, so
+the same shapes exist on every size in BOARD_SIZES. Midgame positions are
+generated from a fixed seed and are identical between runs.
+"""
+
+import random
+from game.board import Board, AI, HUMAN
+from game.constants import BOARD_SIZES
+
+# Hand-made tactical shapes: (dr, dc, player) offsets from the centre
+TACTICAL_SHAPES = {
+    # AI completes an open four into five
+    "win_in_one": [(0, -2, HUMAN), (0, -1, AI), (1, -1, HUMAN), (0, 0, AI),
+                   (1, 0, HUMAN), (0, 1, AI), (2, 2, HUMAN), (0, 2, AI),
+                   (-2, 1, HUMAN)],
+    # HUMAN threatens five, AI must block
+    "block_four": [(0, -1, HUMAN), (1, 1, AI), (0, 0, HUMAN), (-1, 2, AI),
+                   (0, 1, HUMAN), (0, -2, AI), (0, 2, HUMAN), (2, 0, AI),
+                   (-1, -1, HUMAN)],
+    # HUMAN has an open three
+    "open_three": [(0, -1, HUMAN), (1, 1, AI), (0, 0, HUMAN), (2, 2, AI),
+                   (0, 1, HUMAN)],
+    # AI can create two threats with one stone
+    "double_threat": [(2, 2, HUMAN), (0, -2, AI), (-2, 2, HUMAN), (0, -1, AI),
+                      (2, -2, HUMAN), (1, 0, AI), (-2, -2, HUMAN), (2, 0, AI),
+                      (3, 3, HUMAN)],
+}
+
+OPENING_SHAPES = {
+    "opening_1": [(0, 0, HUMAN)],
+    "opening_3": [(0, 0, HUMAN), (1, 1, AI), (0, 1, HUMAN)],
+    "opening_5": [(0, 0, HUMAN), (1, 1, AI), (0, 1, HUMAN), (-1, 1, AI),
+                  (1, -1, HUMAN)],
+}
+
+MIDGAME_STONES = (16, 30)
+CORPUS_SEED = 20240601
+
+
+def _midgame_moves(n, stones, seed):
+    """Alternating moves clustered around the centre, never ending the game"""
+    rng = random.Random(seed)
+    board = Board(n)
+    center = n // 2
+    player = HUMAN
+    moves = []
+    spread = max(2, min(center, 4))
+    while len(moves) < stones:
+        r = center + rng.randint(-spread, spread)
+        c = center + rng.randint(-spread, spread)
+        if not board.is_valid_move(r, c) or board.is_winning_move(r, c, player):
+            continue
+        board.make_move(r, c, player)
+        moves.append((r, c, player))
+        player = -player
+    return moves
+
+
+def _shape_moves(n, shape):
+    center = n // 2
+    return [(center + dr, center + dc, player) for dr, dc, player in shape]
+
+
+def build_corpus(sizes=None):
+    """
+    Return the benchmark positions
+
+    Returns:
+        list: [{"name", "size", "category", "moves"}, ...] where moves is
+        a list of (row, col, player)
+    """
+    corpus = []
+    for n in sizes or BOARD_SIZES:
+        for name, shape in OPENING_SHAPES.items():
+            corpus.append({"name": f"{name}_{n}", "size": n, "category": "opening",
+                           "moves": _shape_moves(n, shape)})
+        for stones in MIDGAME_STONES:
+            if stones > n * n // 3:
+                continue
+            corpus.append({"name": f"midgame_{stones}_{n}", "size": n, "category": "midgame",
+                           "moves": _midgame_moves(n, stones, CORPUS_SEED + n * 100 + stones)})
+        for name, shape in TACTICAL_SHAPES.items():
+            corpus.append({"name": f"{name}_{n}", "size": n, "category": "tactical",
+                           "moves": _shape_moves(n, shape)})
+    return corpus
+
+
+def build_board(position, backend="list"):
+    """Replay a corpus position onto a fresh Board"""
+    board = Board(position["size"], backend)
+    for r, c, player in position["moves"]:
+        if not board.make_move(r, c, player):
+            raise ValueError(f"Invalid move {(r, c)} in position {position['name']}")
+    return board
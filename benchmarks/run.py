@@ -0,0 +1,216 @@
+"""
+Run the AI engine benchmarks and write the results as JSON
+
+Usage:
+    python -m benchmarks.run [--output FILE] [--baseline FILE]
+                             [--sizes 9 15 19] [--presets hard expert]
+                             [--search-sizes 15] [--allocations] [--quick]
+
+Micro benchmarks (check_winner, evaluate_board_by_lines,
+generate_moves_nearby, order_moves, and every registered evaluator as
+eval_<name>_full / eval_<name>_incremental, plus make_undo_with_listeners
+for the cost incremental evaluators add to each move) run on every
+corpus position; full
+AIPlayer.get_best_move runs per difficulty preset on --search-sizes.
+With --baseline, mean times are compared against a stored run and the
+exit status is 1 if anything got slower than --threshold.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from ai.ai_player import AIPlayer
+from ai.heuristics import evaluate_board_by_lines, EVALUATORS
+from ai.minimax import generate_moves_nearby, order_moves
+from game.board import AI, HUMAN
+from game.constants import BOARD_SIZES, DIFFICULTY_LEVELS
+from benchmarks.positions import build_board, build_corpus
+
+MIN_BENCH_TIME = 0.2  # seconds spent on each micro benchmark
+MAX_REPEATS = 10000
+
+
+def _time_calls(func, min_time):
+    """Call func until min_time has passed; return (calls, mean seconds)"""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while calls < MAX_REPEATS and (calls == 0 or elapsed < min_time):
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls, elapsed / calls
+
+
+def _allocations(func):
+    """Peak and net bytes allocated by one call of func"""
+    tracemalloc.start()
+    try:
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak, "retained_bytes": current}
+
+
+def micro_benchmarks(board, min_time):
+    player = AI if board.current_player == AI else HUMAN
+    moves = generate_moves_nearby(board)
+    funcs = {
+        "check_winner": lambda: board.check_winner(player),
+        "evaluate_board_by_lines": lambda: evaluate_board_by_lines(board, player),
+        "generate_moves_nearby": lambda: generate_moves_nearby(board),
+        "order_moves": lambda: order_moves(board, moves, player),
+    }
+    # Cost per call of every registered evaluator: the full scan, and for
+    # incremental ones the listener read plus the update cost of one
+    # make_move/undo_move pair
+    move = moves[0] if moves else None
+    for ev in EVALUATORS.values():
+        funcs[f"eval_{ev.name}_full"] = lambda ev=ev: ev.full(board)
+        if ev.is_incremental:
+            ev.evaluate(board)  # attach the listener outside the timing
+            funcs[f"eval_{ev.name}_incremental"] = lambda ev=ev: ev.evaluate(board)
+    if move is not None:
+        def make_undo():
+            board.make_move(move[0], move[1], player)
+            board.undo_move()
+        funcs["make_undo_with_listeners"] = make_undo
+    results = {}
+    for name, func in funcs.items():
+        calls, mean = _time_calls(func, min_time)
+        results[name] = {"calls": calls, "mean_s": mean, **_allocations(func)}
+    return results
+
+
+def search_benchmark(board, preset, allocations):
+    board = board.copy()
+    ai = AIPlayer(difficulty=preset, seed=0)
+    start = time.perf_counter()
+    move = ai.get_best_move(board)
+    wall = time.perf_counter() - start
+    stats = ai.last_stats
+
+    time_to_depth = {}
+    total = 0.0
+    for depth, seconds in zip(stats.depths, stats.iteration_times):
+        total += seconds
+        time_to_depth[str(depth)] = total
+
+    result = {
+        "move": list(move) if move else None,
+        "mean_s": wall,
+        "nodes": stats.nodes,
+        "nps": stats.nps,
+        "depth": stats.depth,
+        "time_to_depth": time_to_depth,
+        "stats": stats.as_dict(),
+    }
+    if allocations:
+        result.update(_allocations(lambda: AIPlayer(difficulty=preset, seed=0).get_best_move(board)))
+    ai.close()
+    return result
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, presets, search_sizes, allocations, min_time):
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+        },
+        "micro": {},
+        "search": {},
+    }
+    for position in build_corpus(sizes):
+        board = build_board(position)
+        print(f"  micro  {position['name']}", file=sys.stderr)
+        results["micro"][position["name"]] = micro_benchmarks(board, min_time)
+
+    for position in build_corpus(search_sizes):
+        board = build_board(position)
+        for preset in presets:
+            name = f"{position['name']}/{preset}"
+            print(f"  search {name}", file=sys.stderr)
+            results["search"][name] = search_benchmark(board, preset, allocations)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Print mean-time ratios against a baseline; return the regressions"""
+    regressions = []
+    for section in ("micro", "search"):
+        for name, entry in current.get(section, {}).items():
+            old = baseline.get(section, {}).get(name)
+            if old is None:
+                continue
+            pairs = entry.items() if section == "micro" else [("get_best_move", entry)]
+            old_pairs = old if section == "micro" else {"get_best_move": old}
+            for bench, data in pairs:
+                if bench not in old_pairs or not old_pairs[bench]["mean_s"]:
+                    continue
+                ratio = data["mean_s"] / old_pairs[bench]["mean_s"]
+                flag = ""
+                if ratio > 1 + threshold:
+                    flag = "  SLOWER"
+                    regressions.append((section, name, bench, ratio))
+                print(f"{section:6} {name:40} {bench:24} x{ratio:6.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gomoku AI benchmarks")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown against the baseline (default 0.10)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BOARD_SIZES)
+    parser.add_argument("--search-sizes", type=int, nargs="+", default=[15])
+    parser.add_argument("--presets", nargs="+", default=DIFFICULTY_LEVELS,
+                        choices=DIFFICULTY_LEVELS)
+    parser.add_argument("--allocations", action="store_true",
+                        help="also trace allocations of full searches (slow)")
+    parser.add_argument("--quick", action="store_true",
+                        help="shorter micro benchmarks, easy/medium presets only")
+    args = parser.parse_args(argv)
+
+    min_time = MIN_BENCH_TIME
+    presets = args.presets
+    if args.quick:
+        min_time = 0.02
+        presets = [p for p in presets if p in ("easy", "medium")]
+
+    results = run(args.sizes, presets, args.search_sizes, args.allocations, min_time)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
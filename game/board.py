@@ -3,20 +3,190 @@ Board class for Gomoku game with enhanced features
 Author: [Your Name/Team]
 """
 
+import random
+
 EMPTY = 0
 AI = 1
 HUMAN = -1
 
+# Zobrist keys are generated from a fixed seed so hashes are stable
+# between runs (needed for anything persisted to disk).
+ZOBRIST_SEED = 0x5EED_601C
+_zobrist_tables = {}
+
+
+def zobrist_table(n):
+    """
+    Return the Zobrist keys for an n x n board
+    
+    Returns:
+        list: table[r * n + c] = {AI: key, HUMAN: key}
+    """
+    table = _zobrist_tables.get(n)
+    if table is None:
+        rng = random.Random(ZOBRIST_SEED + n)
+        table = [{AI: rng.getrandbits(64), HUMAN: rng.getrandbits(64)}
+                 for _ in range(n * n)]
+        _zobrist_tables[n] = table
+    return table
+
+# Default distance (in king moves) from a stone at which empty cells
+# become candidate moves
+CANDIDATE_RADIUS = 2
+_neighbour_tables = {}
+
+
+def neighbour_table(n, radius):
+    """
+    Return, for every flat cell index, the cells within radius of it
+    
+    Returns:
+        list: table[r * n + c] = [(index, (row, col)), ...] excluding (r, c)
+    """
+    key = (n, radius)
+    table = _neighbour_tables.get(key)
+    if table is None:
+        table = []
+        for r in range(n):
+            for c in range(n):
+                cells = []
+                for nr in range(max(0, r - radius), min(n, r + radius + 1)):
+                    for nc in range(max(0, c - radius), min(n, c + radius + 1)):
+                        if nr != r or nc != c:
+                            cells.append((nr * n + nc, (nr, nc)))
+                table.append(cells)
+        _neighbour_tables[key] = table
+    return table
+
+# The 8 symmetries of the square board: transform t transposes when
+# t & 4, then mirrors the rows when t & 1 and the columns when t & 2
+SYMMETRIES = 8
+_symmetry_tables = {}
+
+
+def symmetry_cell(r, c, n, t):
+    """Image of (r, c) under symmetry t"""
+    if t & 4:
+        r, c = c, r
+    if t & 1:
+        r = n - 1 - r
+    if t & 2:
+        c = n - 1 - c
+    return r, c
+
+
+def inverse_symmetry_cell(r, c, n, t):
+    """Cell that symmetry t maps onto (r, c)"""
+    if t & 2:
+        c = n - 1 - c
+    if t & 1:
+        r = n - 1 - r
+    if t & 4:
+        r, c = c, r
+    return r, c
+
+
+def symmetry_table(n):
+    """
+    Return flat-index maps for the 8 symmetries of an n x n board
+    
+    Returns:
+        list: table[t][r * n + c] = flat index of symmetry_cell(r, c, n, t)
+    """
+    table = _symmetry_tables.get(n)
+    if table is None:
+        table = []
+        for t in range(SYMMETRIES):
+            mapping = []
+            for r in range(n):
+                for c in range(n):
+                    tr, tc = symmetry_cell(r, c, n, t)
+                    mapping.append(tr * n + tc)
+            table.append(mapping)
+        _symmetry_tables[n] = table
+    return table
+
+
+_symmetry_zobrist = {}
+
+
+def symmetry_zobrist(n):
+    """
+    Return, for every cell, its Zobrist key under each of the 8 symmetries
+    
+    Returns:
+        list: table[r * n + c] = {AI: (key_0, ..., key_7), HUMAN: (...)}
+        where key_t is the key of symmetry_cell(r, c, n, t)
+    """
+    table = _symmetry_zobrist.get(n)
+    if table is None:
+        zobrist = zobrist_table(n)
+        maps = symmetry_table(n)
+        table = [{player: tuple(zobrist[maps[t][i]][player] for t in range(SYMMETRIES))
+                  for player in (AI, HUMAN)}
+                 for i in range(n * n)]
+        _symmetry_zobrist[n] = table
+    return table
+
+_line_tables = {}
+
+
+def line_table(n):
+    """
+    Map cells to their place in the four lines through them
+    
+    Families follow the order of Board.directions: columns, rows, then
+    the down-right and down-left diagonals. A cell's position in a line
+    is its row for columns and its column for rows and both diagonal
+    families, so neighbours along a line are neighbouring bits.
+    
+    Returns:
+        tuple: (cells, bounds) where cells[r * n + c] lists
+        (family, line, position, bit) for the four lines through (r, c)
+        and bounds[family][line] is the (lowest, highest) position on the
+        board
+    """
+    tables = _line_tables.get(n)
+    if tables is None:
+        cells = []
+        for r in range(n):
+            for c in range(n):
+                cells.append(((0, c, r, 1 << r),
+                              (1, r, c, 1 << c),
+                              (2, r - c + n - 1, c, 1 << c),
+                              (3, r + c, c, 1 << c)))
+        straight = [(0, n - 1)] * n
+        diagonal = [(max(0, -(k - n + 1)), min(n - 1, n - 1 - (k - n + 1)))
+                    for k in range(2 * n - 1)]
+        anti = [(max(0, k - n + 1), min(n - 1, k)) for k in range(2 * n - 1)]
+        tables = (cells, (straight, straight, diagonal, anti))
+        _line_tables[n] = tables
+    return tables
+
+
+def has_five(mask):
+    """True if mask has five consecutive bits set"""
+    return mask & (mask >> 1) & (mask >> 2) & (mask >> 3) & (mask >> 4) != 0
+
+BACKENDS = ("list", "numpy")
+
 class Board:
-    def __init__(self, n=15):
+    def __init__(self, n=15, backend="list", radius=CANDIDATE_RADIUS):
         """
         Initialize Gomoku board
         
         Args:
             n: board size (n x n)
+            backend: "list" (list of lists) or "numpy" (int8 ndarray with
+                     vectorized line evaluation)
+            radius: distance from existing stones at which empty cells
+                    are offered as candidate moves
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown board backend: {backend}")
         self.n = n
-        self.grid = [[EMPTY for _ in range(n)] for _ in range(n)]
+        self.backend = backend
+        self.grid = self._new_grid()
         self.move_history = []  # Track moves for undo/redo
         self.current_player = HUMAN  # Human starts first
         
@@ -31,6 +201,58 @@ class Board:
         # Statistics
         self.move_count = 0
         self.last_move = None
+        
+        # Zobrist hash of the stones on the board, updated by XOR
+        self.zobrist = zobrist_table(n)
+        self.hash = 0
+        
+        # Hashes of the 8 symmetric images of the position (sym_hashes[0]
+        # is the identity, equal to hash), for canonical_hash()
+        self.sym_zobrist = symmetry_zobrist(n)
+        self.sym_hashes = (0,) * SYMMETRIES
+        
+        # Cached winner, maintained by make_move/undo_move
+        self.winner = None
+        self.win_index = None  # index in move_history of the winning move
+        
+        # Candidate frontier: near[i] counts the stones within radius of
+        # cell i, candidates holds the empty cells with a non-zero count
+        self.radius = radius
+        self.neighbours = neighbour_table(n, radius)
+        self.near = [0] * (n * n)
+        self.candidates = set()
+        
+        # Every line as a per-player bitmask: lines[player][family][line]
+        # has bit p set when the cell at position p holds player's stone
+        # (see line_table)
+        self.line_cells, self.line_bounds = line_table(n)
+        self.lines = self._new_lines()
+        
+        # Incremental state kept by other modules (e.g. evaluators),
+        # notified on every placed/removed stone
+        self.listeners = {}
+    
+    def attach(self, name, listener):
+        """
+        Register a listener updated by make_move/undo_move
+        
+        The listener must provide on_place(r, c, player) and
+        on_remove(r, c, player). Listeners are not carried over by
+        copy() or reset(); owners rebuild them on demand.
+        """
+        self.listeners[name] = listener
+        return listener
+    
+    def _new_lines(self):
+        n = self.n
+        return {player: [[0] * n, [0] * n, [0] * (2 * n - 1), [0] * (2 * n - 1)]
+                for player in (AI, HUMAN)}
+    
+    def _new_grid(self):
+        if self.backend == "numpy":
+            from game import vectorized
+            return vectorized.new_grid(self.n)
+        return [[EMPTY for _ in range(self.n)] for _ in range(self.n)]
     
     def make_move(self, r, c, player):
         """
@@ -47,12 +269,34 @@ class Board:
         if not self.is_valid_move(r, c):
             return False
         
+        # Only the four lines through the new stone can complete a five
+        if self.winner is None and self.is_winning_move(r, c, player):
+            self.winner = player
+            self.win_index = len(self.move_history)
+        
         self.grid[r][c] = player
+        self.hash ^= self.zobrist[r * self.n + c][player]
+        self.sym_hashes = tuple(map(int.__xor__, self.sym_hashes,
+                                    self.sym_zobrist[r * self.n + c][player]))
+        lines = self.lines[player]
+        for family, line, _, bit in self.line_cells[r * self.n + c]:
+            lines[family][line] |= bit
         self.move_history.append((r, c, player))
         self.move_count += 1
         self.last_move = (r, c)
         self.current_player = -player  # Switch player
         
+        self.candidates.discard((r, c))
+        near = self.near
+        g = self.grid
+        for j, cell in self.neighbours[r * self.n + c]:
+            near[j] += 1
+            if near[j] == 1 and g[cell[0]][cell[1]] == EMPTY:
+                self.candidates.add(cell)
+        
+        for listener in self.listeners.values():
+            listener.on_place(r, c, player)
+        
         return True
     
     def undo_move(self, r=None, c=None):
@@ -73,38 +317,87 @@ class Board:
             for i in range(len(self.move_history)-1, -1, -1):
                 mr, mc, mp = self.move_history[i]
                 if mr == r and mc == c:
-                    self.grid[mr][mc] = EMPTY
-                    del self.move_history[i]
-                    self.move_count -= 1
-                    self.current_player = mp  # Switch back to this player
-                    
-                    # Update last move
-                    if self.move_history:
-                        self.last_move = self.move_history[-1][:2]
-                    else:
-                        self.last_move = None
+                    self._remove_move(i)
                     return True
             return False
         else:
             # Undo last move
-            r, c, player = self.move_history.pop()
-            self.grid[r][c] = EMPTY
-            self.move_count -= 1
-            self.current_player = player
-            
-            # Update last move
-            if self.move_history:
-                self.last_move = self.move_history[-1][:2]
-            else:
-                self.last_move = None
-            
+            self._remove_move(len(self.move_history) - 1)
             return True
     
+    def _remove_move(self, i):
+        """Take back move_history[i] and restore the derived state"""
+        r, c, player = self.move_history.pop(i)
+        self.grid[r][c] = EMPTY
+        self.hash ^= self.zobrist[r * self.n + c][player]
+        self.sym_hashes = tuple(map(int.__xor__, self.sym_hashes,
+                                    self.sym_zobrist[r * self.n + c][player]))
+        lines = self.lines[player]
+        for family, line, _, bit in self.line_cells[r * self.n + c]:
+            lines[family][line] ^= bit
+        self.move_count -= 1
+        self.current_player = player  # Switch back to this player
+        
+        near = self.near
+        for j, cell in self.neighbours[r * self.n + c]:
+            near[j] -= 1
+            if near[j] == 0:
+                self.candidates.discard(cell)
+        if near[r * self.n + c] > 0:
+            self.candidates.add((r, c))
+        
+        for listener in self.listeners.values():
+            listener.on_remove(r, c, player)
+        
+        if self.winner is not None:
+            if i == self.win_index:
+                # The winning stone itself was taken back
+                self.winner = None
+                self.win_index = None
+            elif self.win_index is None or i < self.win_index:
+                # A stone that may belong to the five was removed
+                self._refresh_winner()
+        
+        # Update last move
+        if self.move_history:
+            self.last_move = self.move_history[-1][:2]
+        else:
+            self.last_move = None
+    
+    def _refresh_winner(self):
+        """
+        Recompute the cached winner with a full board scan
+        
+        The winning move is unknown afterwards, so win_index stays None
+        and every later undo re-checks.
+        """
+        self.win_index = None
+        if self.check_winner(AI):
+            self.winner = AI
+        elif self.check_winner(HUMAN):
+            self.winner = HUMAN
+        else:
+            self.winner = None
+    
     def is_valid_move(self, r, c):
         """Check if move is within board and on empty cell"""
         return (0 <= r < self.n and 0 <= c < self.n and 
                 self.grid[r][c] == EMPTY)
     
+    def is_winning_move(self, r, c, player):
+        """
+        Check if a stone of player at (r, c) makes five in a row
+        
+        Only the four line masks through (r, c) are tested (shift and
+        AND), so this is O(1). The cell itself is treated as holding
+        player's stone whether or not it has been placed yet.
+        """
+        lines = self.lines[player]
+        for family, line, _, bit in self.line_cells[r * self.n + c]:
+            if has_five(lines[family][line] | bit):
+                return True
+        return False
+    
     def check_winner(self, player):
         """
         Check if specified player has won
@@ -115,52 +408,39 @@ class Board:
         Returns:
             bool: True if player has won
         """
-        g = self.grid
+        for family in self.lines[player]:
+            for mask in family:
+                if has_five(mask):
+                    return True
+        return False
+    
+    def canonical_hash(self):
+        """
+        Zobrist hash shared by all 8 symmetric versions of the position
         
-        for r in range(self.n):
-            for c in range(self.n):
-                if g[r][c] != player:
-                    continue
-                
-                for dr, dc in self.directions:
-                    count = 1
-                    
-                    # Check forward direction
-                    nr, nc = r + dr, c + dc
-                    while (0 <= nr < self.n and 0 <= nc < self.n and 
-                           g[nr][nc] == player):
-                        count += 1
-                        nr += dr
-                        nc += dc
-                    
-                    # Check backward direction
-                    nr, nc = r - dr, c - dc
-                    while (0 <= nr < self.n and 0 <= nc < self.n and 
-                           g[nr][nc] == player):
-                        count += 1
-                        nr -= dr
-                        nc -= dc
-                    
-                    if count >= 5:
-                        return True
+        The 8 hashes are kept up to date by make_move/undo_move, so this
+        is O(1).
         
-        return False
+        Returns:
+            tuple: (key, t) where key is the smallest hash over the
+            symmetries and t the symmetry that produces it; a move (r, c)
+            here is symmetry_cell(r, c, n, t) in the canonical frame
+        """
+        hashes = self.sym_hashes
+        key = min(hashes)
+        return key, hashes.index(key)
     
     def get_winner(self):
-        """Check if there's a winner and return which player"""
-        if self.check_winner(AI):
-            return AI
-        if self.check_winner(HUMAN):
-            return HUMAN
-        return None
+        """Return the player who has won, or None"""
+        return self.winner
     
     def is_game_over(self):
         """Check if game is over (win or draw)"""
-        if self.get_winner() is not None:
+        if self.winner is not None:
             return True
         
         # Check for draw (board full)
-        return all(cell != EMPTY for row in self.grid for cell in row)
+        return self.move_count >= self.n * self.n
     
     def get_moves(self):
         """
@@ -169,7 +449,7 @@ class Board:
         Returns:
             list: [(row, col), ...] of empty cells
         """
-        # If there are existing pieces, only consider adjacent moves
+        # If there are existing pieces, only consider cells near them
         # for better performance (Gomoku is usually played locally)
         moves = []
         
@@ -182,27 +462,10 @@ class Board:
                         moves.append((r, c))
             return moves
         
-        # Get moves adjacent to existing pieces
-        visited = set()
-        for r in range(self.n):
-            for c in range(self.n):
-                if self.grid[r][c] == EMPTY:
-                    continue
-                
-                # Check all adjacent positions
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        if dr == 0 and dc == 0:
-                            continue
-                        
-                        nr, nc = r + dr, c + dc
-                        if (0 <= nr < self.n and 0 <= nc < self.n and
-                            self.grid[nr][nc] == EMPTY and
-                            (nr, nc) not in visited):
-                            moves.append((nr, nc))
-                            visited.add((nr, nc))
-        
-        # If no adjacent moves (shouldn't happen), fall back to all moves
+        # The candidate frontier is maintained by make_move/undo_move
+        moves = sorted(self.candidates)
+        
+        # If no nearby moves (shouldn't happen), fall back to all moves
         if not moves:
             moves = [(r, c) for r in range(self.n) for c in range(self.n)
                     if self.grid[r][c] == EMPTY]
@@ -223,20 +486,39 @@ class Board:
     
     def reset(self):
         """Reset the board to initial state"""
-        self.grid = [[EMPTY for _ in range(self.n)] for _ in range(self.n)]
+        self.grid = self._new_grid()
         self.move_history = []
         self.move_count = 0
         self.current_player = HUMAN
         self.last_move = None
+        self.hash = 0
+        self.sym_hashes = (0,) * SYMMETRIES
+        self.lines = self._new_lines()
+        self.winner = None
+        self.win_index = None
+        self.near = [0] * (self.n * self.n)
+        self.candidates = set()
+        self.listeners = {}
     
     def copy(self):
         """Create a deep copy of the board"""
-        new_board = Board(self.n)
-        new_board.grid = [row[:] for row in self.grid]
+        new_board = Board(self.n, self.backend, self.radius)
+        if self.backend == "numpy":
+            new_board.grid = self.grid.copy()
+        else:
+            new_board.grid = [row[:] for row in self.grid]
         new_board.move_history = self.move_history[:]
         new_board.move_count = self.move_count
         new_board.current_player = self.current_player
         new_board.last_move = self.last_move
+        new_board.hash = self.hash
+        new_board.sym_hashes = self.sym_hashes
+        new_board.lines = {player: [family[:] for family in families]
+                           for player, families in self.lines.items()}
+        new_board.winner = self.winner
+        new_board.win_index = self.win_index
+        new_board.near = self.near[:]
+        new_board.candidates = set(self.candidates)
         return new_board
     
     def get_score_estimate(self, player):
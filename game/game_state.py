@@ -0,0 +1,176 @@
+"""
+Compact, immutable snapshot of a Gomoku position
+Author: [Your Name/Team]
+"""
+
+import struct
+
+from game.board import Board, EMPTY, AI, HUMAN, zobrist_table
+
+# Cell encoding inside the bytes grid
+_CODE = {EMPTY: 0, AI: 1, HUMAN: 2}
+_PLAYER = (EMPTY, AI, HUMAN)
+
+# n, to_move, move_count, last row, last col, hash
+_HEADER = struct.Struct("<BbHBBQ")
+_NO_MOVE = 0xFF
+
+# Longest chain of child deltas before a state copies its grid
+MAX_DELTA_CHAIN = 16
+
+
+class GameState:
+    """
+    Immutable position: board size, stones, side to move and Zobrist hash
+
+    The grid is a bytes object (0 empty, 1 AI, 2 HUMAN). child() is O(1):
+    the new state only records the placed stone and points at its parent;
+    the full grid is built on first use (copy-on-write). The hash equals
+    Board.hash for the same stones, so states and boards can share caches.
+    """
+
+    __slots__ = ("n", "hash", "to_move", "move_count", "last_move",
+                 "_cells", "_parent", "_delta", "_chain")
+
+    def __init__(self, n, cells, to_move=HUMAN, move_count=None, last_move=None, hash=None):
+        """
+        Args:
+            n: board size
+            cells: bytes of length n*n in the encoding above
+            to_move: AI (1) or HUMAN (-1)
+            move_count: number of stones (counted from cells if None)
+            last_move: (row, col) or None
+            hash: Zobrist hash (computed from cells if None)
+        """
+        cells = bytes(cells)
+        if len(cells) != n * n:
+            raise ValueError("cells must hold n*n entries")
+        if hash is None:
+            table = zobrist_table(n)
+            hash = 0
+            for i, code in enumerate(cells):
+                if code:
+                    hash ^= table[i][_PLAYER[code]]
+        if move_count is None:
+            move_count = n * n - cells.count(0)
+        self._init(n, hash, to_move, move_count, last_move, cells, None, None, 0)
+
+    def _init(self, n, hash, to_move, move_count, last_move, cells, parent, delta, chain):
+        setattr_ = object.__setattr__
+        setattr_(self, "n", n)
+        setattr_(self, "hash", hash)
+        setattr_(self, "to_move", to_move)
+        setattr_(self, "move_count", move_count)
+        setattr_(self, "last_move", last_move)
+        setattr_(self, "_cells", cells)
+        setattr_(self, "_parent", parent)
+        setattr_(self, "_delta", delta)
+        setattr_(self, "_chain", chain)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState is immutable")
+
+    @classmethod
+    def from_board(cls, board):
+        """Snapshot a Board"""
+        n = board.n
+        g = board.grid
+        cells = bytes(_CODE[int(g[r][c])] for r in range(n) for c in range(n))
+        return cls(n, cells, board.current_player, board.move_count,
+                   board.last_move, board.hash)
+
+    def to_board(self, backend="list"):
+        """Build a Board holding the same stones (move order is not kept)"""
+        board = Board(self.n, backend)
+        n = self.n
+        for i, code in enumerate(self.cells):
+            if code:
+                r, c = divmod(i, n)
+                board.make_move(r, c, _PLAYER[code])
+        board.current_player = self.to_move
+        if self.last_move is not None and self.move_count:
+            # Keep the real last move at the end of the history
+            r, c = self.last_move
+            player = board.grid[r][c]
+            board.undo_move(r, c)
+            board.make_move(r, c, player)
+            board.current_player = self.to_move
+        return board
+
+    @property
+    def cells(self):
+        """The grid as bytes, materialized from the parent chain if needed"""
+        if self._cells is None:
+            grid = bytearray(self._parent.cells)
+            i, code = self._delta
+            grid[i] = code
+            self._init(self.n, self.hash, self.to_move, self.move_count, self.last_move,
+                       bytes(grid), None, None, 0)
+        return self._cells
+
+    def get(self, r, c):
+        """Player at (r, c): EMPTY, AI or HUMAN"""
+        i = r * self.n + c
+        state = self
+        while state._cells is None:
+            if state._delta[0] == i:
+                return _PLAYER[state._delta[1]]
+            state = state._parent
+        return _PLAYER[state._cells[i]]
+
+    def is_valid_move(self, r, c):
+        return 0 <= r < self.n and 0 <= c < self.n and self.get(r, c) == EMPTY
+
+    def child(self, r, c, player=None):
+        """
+        State after player (default: side to move) places a stone at (r, c)
+
+        O(1) unless the delta chain is long, in which case the grid is
+        copied once so lookups stay cheap.
+        """
+        if not self.is_valid_move(r, c):
+            raise ValueError(f"Invalid move {(r, c)}")
+        if player is None:
+            player = self.to_move
+        i = r * self.n + c
+        hash = self.hash ^ zobrist_table(self.n)[i][player]
+        state = GameState.__new__(GameState)
+        if self._chain >= MAX_DELTA_CHAIN:
+            grid = bytearray(self.cells)
+            grid[i] = _CODE[player]
+            state._init(self.n, hash, -player, self.move_count + 1, (r, c),
+                        bytes(grid), None, None, 0)
+        else:
+            state._init(self.n, hash, -player, self.move_count + 1, (r, c),
+                        None, self, (i, _CODE[player]), self._chain + 1)
+        return state
+
+    def to_bytes(self):
+        """Serialize to a compact buffer (header + one byte per cell)"""
+        r, c = self.last_move if self.last_move is not None else (_NO_MOVE, _NO_MOVE)
+        header = _HEADER.pack(self.n, self.to_move, self.move_count, r, c, self.hash)
+        return header + self.cells
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Inverse of to_bytes()"""
+        n, to_move, move_count, r, c, hash = _HEADER.unpack_from(data)
+        last_move = None if r == _NO_MOVE else (r, c)
+        cells = bytes(data[_HEADER.size:_HEADER.size + n * n])
+        return cls(n, cells, to_move, move_count, last_move, hash)
+
+    def __reduce__(self):
+        # Pickle through the compact buffer (e.g. for process pools)
+        return (GameState.from_bytes, (self.to_bytes(),))
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (self.n == other.n and self.hash == other.hash and
+                self.to_move == other.to_move and self.cells == other.cells)
+
+    def __repr__(self):
+        return f"GameState(n={self.n}, moves={self.move_count}, to_move={self.to_move})"
@@ -0,0 +1,86 @@
+"""
+NumPy helpers for the array-backed Board
+
+All functions accept a single (n, n) int8 grid or a stack of grids with
+shape (..., n, n), so bulk analysis can score many positions in one call.
+Wins are not detected here: Board.check_winner reads the per-player line
+masks, which both backends maintain.
+"""
+
+import numpy as np
+
+EMPTY = 0
+AI = 1
+HUMAN = -1
+WALL = 2  # padding value for cells outside the board
+
+
+def new_grid(n):
+    """Create an empty n x n int8 grid"""
+    return np.zeros((n, n), dtype=np.int8)
+
+
+def windows7(grid):
+    """
+    Collect every 5-cell window together with its two end cells
+
+    Args:
+        grid: int8 array with shape (..., n, n)
+
+    Returns:
+        list: one array per direction with shape (..., a, b, 7), where
+        [..., 1:6] are the window cells and [..., 0] / [..., 6] the cells
+        before and after it (WALL when off the board)
+    """
+    n = grid.shape[-1]
+    pad = [(0, 0)] * (grid.ndim - 2) + [(1, 1), (1, 1)]
+    p = np.pad(grid, pad, constant_values=WALL)
+    m = n - 4  # number of window starts along a line
+    if m <= 0:
+        return []
+    return [
+        # horizontal
+        np.stack([p[..., 1:n+1, k:k+m] for k in range(7)], axis=-1),
+        # vertical
+        np.stack([p[..., k:k+m, 1:n+1] for k in range(7)], axis=-1),
+        # diagonal \
+        np.stack([p[..., k:k+m, k:k+m] for k in range(7)], axis=-1),
+        # diagonal /
+        np.stack([p[..., k:k+m, 6-k:6-k+m] for k in range(7)], axis=-1),
+    ]
+
+
+def score_table(scores):
+    """Turn a {(count, open_ends): score} dict into a (6, 3) lookup array"""
+    table = np.zeros((6, 3), dtype=np.int64)
+    for (count, open_ends), value in scores.items():
+        table[count, open_ends] = value
+    return table
+
+
+def evaluate_lines(grid, player, table):
+    """
+    Vectorized evaluate_board_by_lines
+
+    Args:
+        grid: int8 array with shape (..., n, n)
+        player: AI (1) or HUMAN (-1)
+        table: lookup array from score_table()
+
+    Returns:
+        int for a single grid, int64 array for a stack of grids
+    """
+    total = np.zeros(grid.shape[:-2], dtype=np.int64)
+    for w in windows7(grid):
+        mid = w[..., 1:6]
+        mine = (mid == player).sum(axis=-1)
+        theirs = (mid == -player).sum(axis=-1)
+        open_ends = (w[..., 0] == EMPTY).astype(np.int64) + (w[..., 6] == EMPTY)
+        scored = np.where((mine > 0) & (theirs == 0), table[mine, open_ends], 0)
+        total += scored.sum(axis=(-2, -1))
+    if player != AI:
+        total = -total
+    if total.ndim == 0:
+        return int(total)
+    return total
+
@@ -0,0 +1,151 @@
+"""
+Gomoku AI vs AI - Headless Batch Match Runner
+
+Plays N games between two AIPlayer configurations on a process pool and
+streams one JSON line per finished game.
+
+Usage:
+    python match.py --games 200 --size 15 \\
+        --ai1 difficulty=hard --ai2 difficulty=medium,heuristic=Simple \\
+        --processes 8 --output results.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai.ai_player import AIPlayer
+from game.board import Board, AI, HUMAN
+from game.constants import BOARD_SIZES, AI_VS_AI
+
+
+def parse_config(text):
+    """Turn "difficulty=hard,depth=3" into AIPlayer keyword arguments"""
+    config = {}
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        key = key.strip()
+        value = value.strip()
+        if value.lstrip("-").isdigit():
+            value = int(value)
+        config[key] = value
+    return config
+
+
+def play_game(game_id, configs, size, seed, first):
+    """
+    Play one game between configs[0] ("ai1") and configs[1] ("ai2")
+
+    AIPlayer always searches for the AI side, so every player gets its
+    own board with the colours arranged so that its stones are AI.
+
+    Args:
+        first: index (0 or 1) of the player who moves first
+
+    Returns:
+        dict: result record for the JSONL stream
+    """
+    names = ("ai1", "ai2")
+    players = [AIPlayer(seed=seed * 2 + i, **configs[i]) for i in range(2)]
+    # boards[i] shows player i's stones as AI
+    boards = [Board(size), Board(size)]
+    for board in boards:
+        board.current_player = AI if first == 0 else HUMAN
+    boards[1].current_player = -boards[0].current_player
+
+    moves = []
+    winner = None
+    turn = first
+    start = time.time()
+    while True:
+        board = boards[turn]
+        move_start = time.time()
+        move = players[turn].get_best_move(board)
+        move_time = time.time() - move_start
+        stats = players[turn].last_stats
+
+        if move is None or not board.is_valid_move(*move):
+            # An illegal or missing move loses the game
+            winner = names[1 - turn]
+            moves.append({"player": names[turn], "move": move, "time": round(move_time, 4),
+                          "illegal": True})
+            break
+
+        r, c = move
+        boards[turn].make_move(r, c, AI)
+        boards[1 - turn].make_move(r, c, HUMAN)
+        moves.append({"player": names[turn], "move": [r, c], "time": round(move_time, 4),
+                      "stats": stats.as_dict() if stats else None})
+
+        if boards[turn].winner == AI:
+            winner = names[turn]
+            break
+        if boards[turn].is_game_over():
+            break
+        turn = 1 - turn
+
+    for player in players:
+        player.close()
+
+    return {
+        "game": game_id,
+        "mode": AI_VS_AI,
+        "size": size,
+        "seed": seed,
+        "first": names[first],
+        "configs": {"ai1": configs[0], "ai2": configs[1]},
+        "winner": winner or "draw",
+        "num_moves": len(moves),
+        "duration": round(time.time() - start, 3),
+        "moves": moves,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Gomoku AI vs AI matches")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--size", type=int, default=15, choices=BOARD_SIZES)
+    parser.add_argument("--ai1", default="difficulty=medium",
+                        help="AIPlayer options, e.g. difficulty=hard,heuristic=Pattern")
+    parser.add_argument("--ai2", default="difficulty=medium")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSONL file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    configs = (parse_config(args.ai1), parse_config(args.ai2))
+    out = open(args.output, "w") if args.output else sys.stdout
+    tally = {"ai1": 0, "ai2": 0, "draw": 0}
+    move_times = {"ai1": [], "ai2": []}
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            futures = [
+                # alternate who starts so neither config gets the first move
+                pool.submit(play_game, i, configs, args.size, args.seed + i, i % 2)
+                for i in range(args.games)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                tally[result["winner"]] += 1
+                for move in result["moves"]:
+                    move_times[move["player"]].append(move["time"])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Games: {args.games}  ai1 wins: {tally['ai1']}  ai2 wins: {tally['ai2']}  "
+          f"draws: {tally['draw']}", file=sys.stderr)
+    for name, times in move_times.items():
+        if times:
+            print(f"  {name} mean move time: {sum(times) / len(times):.3f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
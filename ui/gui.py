@@ -6,13 +6,16 @@ Course: AI310 & CS361 - Helwan University
 
 import tkinter as tk
 from tkinter import ttk, messagebox, font
-import time
 from game.board import Board, AI, HUMAN
 from ai.ai_player import AIPlayer
+from ai.worker import SearchWorker, PonderWorker
+from ai.persistent_cache import PersistentCache
+from utils.logger import GameLogger
 
 # Constants
 CELL_SIZE = 35
 PADDING = 50
+AI_POLL_MS = 50  # how often the Tk loop checks the background search
 
 # Dark theme colors
 THEME = {
@@ -45,6 +48,23 @@ class ModernGomokuGUI:
         self.game_active = False
         self.game_mode = "human_vs_ai"
         self.ai_thinking = False
+        self.search_worker = None  # background AI search, if any
+        self.hint_worker = None    # background hint search, if any
+        self.ponder_worker = None  # AI thinking on the human's time, if any
+        
+        # What the canvas currently shows (see draw_board)
+        self.drawn_layout = None   # (board size, cell size) of the grid
+        self.drawn_stones = {}     # (r, c) -> player
+        self.resize_pending = False
+        self.logger = GameLogger()
+        
+        # Search results shared across sessions (None if the file can't
+        # be opened)
+        try:
+            self.cache = PersistentCache()
+        except Exception as e:
+            print(f"⚠️ Search cache disabled: {e}")
+            self.cache = None
         
         # Statistics
         self.stats = {
@@ -59,6 +79,7 @@ class ModernGomokuGUI:
         self.setup_styles()
         self.create_main_layout()
         self.setup_shortcuts()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         print("🎮 Gomoku AI Game Started!")
     
@@ -490,7 +511,7 @@ class ModernGomokuGUI:
         self.root.bind("<Control-z>", lambda e: self.undo_move())
         self.root.bind("<Control-h>", lambda e: self.show_hint())
         self.root.bind("<F1>", lambda e: self.show_help())
-        self.root.bind("<Escape>", lambda e: self.root.quit())
+        self.root.bind("<Escape>", lambda e: self.on_close())
     
     def lighten_color(self, color, factor=1.2):
         """Lighten a hex color"""
@@ -529,17 +550,30 @@ class ModernGomokuGUI:
         return 128
     
     def on_canvas_resize(self, event):
-        """Handle canvas resize"""
+        """Handle canvas resize (a burst of events causes one redraw)"""
+        if self.resize_pending:
+            return
+        self.resize_pending = True
+        self.root.after_idle(self.finish_resize)
+    
+    def finish_resize(self):
+        """Redraw once the pending resize events have been handled"""
+        self.resize_pending = False
         if self.game_active and self.board:
             self.draw_board()
     
     def draw_board(self):
-        """Draw the game board with current theme - FIXED VERSION"""
+        """
+        Bring the canvas up to date with the board
+        
+        The grid and coordinates are built once per (board size, cell
+        size); after that only stones that appeared or disappeared since
+        the last call are drawn or deleted (by their "stone_r_c" tag), so
+        the cost does not grow with the number of stones.
+        """
         if not self.game_active or not self.board:
             return
         
-        self.canvas.delete("all")
-        
         # Calculate dimensions
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
@@ -557,6 +591,41 @@ class ModernGomokuGUI:
         if cell_size < 10:  # Minimum cell size
             cell_size = 10
         
+        layout = (self.board.n, cell_size)
+        if layout != self.drawn_layout:
+            self.canvas.delete("all")
+            self.draw_grid(cell_size)
+            self.drawn_layout = layout
+            self.drawn_stones = {}
+        
+        # Remove stones that are no longer on the board (undo, new game)
+        stones = {(r, c): player for r, c, player in self.board.move_history}
+        for (r, c), player in list(self.drawn_stones.items()):
+            if stones.get((r, c)) != player:
+                self.canvas.delete(f"stone_{r}_{c}")
+                del self.drawn_stones[(r, c)]
+        
+        # Draw the new ones
+        for (r, c), player in stones.items():
+            if (r, c) not in self.drawn_stones:
+                self.draw_piece(r, c, player, cell_size)
+                self.drawn_stones[(r, c)] = player
+        
+        # Highlight last move
+        self.canvas.delete("highlight")
+        if self.board.last_move:
+            r, c = self.board.last_move
+            x = PADDING + c * cell_size
+            y = PADDING + r * cell_size
+            
+            self.canvas.create_rectangle(x-3, y-3,
+                                       x+cell_size+3, y+cell_size+3,
+                                       outline=THEME["highlight"],
+                                       width=3,
+                                       tags="highlight")
+    
+    def draw_grid(self, cell_size):
+        """Draw the static grid lines and coordinates"""
         # Calculate total board size in pixels
         board_pixel_size = cell_size * self.board.n
         
@@ -566,13 +635,15 @@ class ModernGomokuGUI:
             y = PADDING + i * cell_size
             self.canvas.create_line(PADDING, y, 
                                    PADDING + board_pixel_size, y,
-                                   fill=THEME["grid_color"], width=1)
+                                   fill=THEME["grid_color"], width=1,
+                                   tags="grid")
             
             # Vertical lines
             x = PADDING + i * cell_size
             self.canvas.create_line(x, PADDING,
                                    x, PADDING + board_pixel_size,
-                                   fill=THEME["grid_color"], width=1)
+                                   fill=THEME["grid_color"], width=1,
+                                   tags="grid")
         
         # Draw coordinates - Show 1-based coordinates
         for i in range(self.board.n):
@@ -581,33 +652,16 @@ class ModernGomokuGUI:
             self.canvas.create_text(x + cell_size // 2, PADDING - 20, 
                                    text=str(i + 1),  # 1-based
                                    font=("Arial", 9),
-                                   fill=THEME["fg"])
+                                   fill=THEME["fg"],
+                                   tags="grid")
             
             # Row numbers (left) - show 1-15 not 0-14
             y = PADDING + i * cell_size
             self.canvas.create_text(PADDING - 20, y + cell_size // 2, 
                                    text=str(i + 1),  # 1-based
                                    font=("Arial", 9),
-                                   fill=THEME["fg"])
-        
-        # Draw pieces - Use entire grid
-        for r in range(self.board.n):
-            for c in range(self.board.n):
-                player = self.board.grid[r][c]
-                if player != 0:
-                    self.draw_piece(r, c, player, cell_size)
-        
-        # Highlight last move
-        if self.board.last_move:
-            r, c = self.board.last_move
-            x = PADDING + c * cell_size
-            y = PADDING + r * cell_size
-            
-            self.canvas.create_rectangle(x-3, y-3,
-                                       x+cell_size+3, y+cell_size+3,
-                                       outline=THEME["highlight"],
-                                       width=3,
-                                       tags="highlight")
+                                   fill=THEME["fg"],
+                                   tags="grid")
     
     def draw_piece(self, r, c, player, cell_size):
         """Draw a game piece - FIXED to match grid coordinates"""
@@ -616,6 +670,7 @@ class ModernGomokuGUI:
         y = PADDING + r * cell_size + cell_size // 2
         
         radius = max(5, cell_size // 2 - 4)
+        tags = ("piece", f"stone_{r}_{c}")
         
         if player == AI:
             color = THEME["ai_color"]
@@ -630,7 +685,7 @@ class ModernGomokuGUI:
                                x+radius+shadow_offset, y+radius+shadow_offset,
                                fill=self.darken_color(color, 0.7),
                                outline="",
-                               tags="piece")
+                               tags=tags)
         
         # Main piece
         self.canvas.create_oval(x-radius, y-radius,
@@ -638,7 +693,7 @@ class ModernGomokuGUI:
                                fill=color,
                                outline=THEME["fg"],
                                width=2,
-                               tags="piece")
+                               tags=tags)
         
         # Piece label
         text_color = "white" if self.get_brightness(color) < 128 else "black"
@@ -646,7 +701,7 @@ class ModernGomokuGUI:
                                text=text,
                                fill=text_color,
                                font=("Arial", max(8, cell_size//3), "bold"),
-                               tags="piece")
+                               tags=tags)
     
     def handle_click(self, event):
         """Handle mouse click on board - FIXED VERSION"""
@@ -702,6 +757,9 @@ class ModernGomokuGUI:
         
         # Make human move
         if self.board.current_player == HUMAN:
+            # Whatever the move, pondering stops here; a predicted move is
+            # answered from the ponder results
+            self.stop_pondering()
             self.make_human_move(r, c)
     
     def make_human_move(self, r, c):
@@ -717,7 +775,7 @@ class ModernGomokuGUI:
         self.update_game_info()
         
         # Check for winner
-        if self.board.check_winner(HUMAN):
+        if self.board.winner == HUMAN:
             self.game_over("🎉 Human Wins!", "human")
             return
         
@@ -736,21 +794,61 @@ class ModernGomokuGUI:
         self.root.after(100, self.make_ai_move)
     
     def make_ai_move(self):
-        """Make a move for AI player"""
+        """Start the AI search in the background and poll for its result"""
         if not self.game_active or not self.board:
             return
         
-        start_time = time.time()
-        move = self.ai_player.get_best_move(self.board)
+        self.cancel_ai_search(wait=True)
+        self.search_worker = SearchWorker(self.ai_player, self.board).start()
+        self.root.after(AI_POLL_MS, self.poll_ai_move, self.search_worker)
+    
+    def poll_ai_move(self, worker):
+        """Check whether the background search has finished"""
+        if worker is not self.search_worker or worker.cancelled:
+            return
+        if not worker.done():
+            self.root.after(AI_POLL_MS, self.poll_ai_move, worker)
+            return
+        
+        self.search_worker = None
+        if worker.error is not None:
+            print(f"❌ AI search failed: {worker.error}")
+        self.apply_ai_move(worker.move, worker.move_time)
+    
+    def start_pondering(self):
+        """Let the AI search the likely human replies in the background"""
+        self.stop_pondering()
+        if self.ai_player is not None and self.ai_player.enable_pondering:
+            self.ponder_worker = PonderWorker(self.ai_player, self.board).start()
+    
+    def stop_pondering(self):
+        """Stop pondering and wait for it, so the AI's table is free again"""
+        if self.ponder_worker is not None:
+            self.ponder_worker.cancel(wait=True)
+            self.ponder_worker = None
+    
+    def cancel_ai_search(self, wait=False):
+        """Stop the background AI search (and any hint or ponder search), if running"""
+        self.stop_pondering()
+        if self.search_worker is not None:
+            self.search_worker.cancel(wait=wait)
+            self.search_worker = None
+        if self.hint_worker is not None:
+            self.hint_worker.cancel()
+            self.hint_worker = None
+    
+    def apply_ai_move(self, move, move_time):
+        """Play the move chosen by the AI search"""
+        if not self.game_active or not self.board:
+            return
         
         if move:
             r, c = move
             self.board.make_move(r, c, AI)
             
-            move_time = time.time() - start_time
-            
             # Add to history
             self.history_listbox.insert(tk.END, f"AI: ({r+1}, {c+1}) [{move_time:.2f}s]")
+            self.logger.log_move("AI", r + 1, c + 1, move_time)
             self.history_listbox.see(tk.END)
             
             self.draw_board()
@@ -764,7 +862,7 @@ class ModernGomokuGUI:
             self.ai_thinking = False
             
             # Check for winner
-            if self.board.check_winner(AI):
+            if self.board.winner == AI:
                 self.game_over("🤖 AI Wins!", "ai")
                 return
             
@@ -774,6 +872,7 @@ class ModernGomokuGUI:
                 return
             
             self.status_label.config(text="✅ Your turn!")
+            self.start_pondering()
         else:
             self.thinking_label.config(text="")
             self.ai_thinking = False
@@ -781,6 +880,9 @@ class ModernGomokuGUI:
     
     def start_game(self):
         """Start a new game"""
+        self.cancel_ai_search(wait=True)
+        if self.game_active:
+            self.save_ai_cache()
         try:
             # Get settings
             board_size = int(self.size_var.get())
@@ -799,7 +901,9 @@ class ModernGomokuGUI:
             
             # Initialize game
             self.board = Board(board_size)
-            self.ai_player = AIPlayer(difficulty=difficulty, heuristic=heuristic)
+            self.ai_player = AIPlayer(difficulty=difficulty, heuristic=heuristic,
+                                      logger=self.logger, cache=self.cache)
+            self.ai_player.load_cache(board_size)
             self.game_active = True
             self.ai_thinking = False
             
@@ -827,6 +931,7 @@ class ModernGomokuGUI:
                 self.root.update()
                 self.root.after(500, self.make_ai_move)
             
+            self.logger.log_game_start(board_size, difficulty, heuristic)
             print(f"\n🎮 New game started:")
             print(f"  Board: {board_size}x{board_size}")
             print(f"  Difficulty: {difficulty}")
@@ -843,6 +948,7 @@ class ModernGomokuGUI:
             messagebox.showinfo("Info", "No moves to undo!")
             return
         
+        self.cancel_ai_search(wait=True)
         if self.board.undo_move():
             # Remove from history
             if self.history_listbox.size() > 0:
@@ -869,10 +975,27 @@ class ModernGomokuGUI:
             messagebox.showinfo("Hint", "It's not your turn!")
             return
         
-        # Create temporary AI for hint
+        if self.hint_worker is not None:
+            return  # a hint is already being computed
+        
+        # Create temporary AI for hint, searching a snapshot in the background
         temp_ai = AIPlayer(difficulty="medium", heuristic="Pattern")
-        move = temp_ai.get_best_move(self.board)
+        self.hint_worker = SearchWorker(temp_ai, self.board).start()
+        self.root.after(AI_POLL_MS, self.poll_hint, self.hint_worker)
+    
+    def poll_hint(self, worker):
+        """Show the hint once its background search has finished"""
+        if worker is not self.hint_worker:
+            return
+        if not worker.done():
+            self.root.after(AI_POLL_MS, self.poll_hint, worker)
+            return
+        
+        self.hint_worker = None
+        if not self.game_active or not self.board or worker.state.hash != self.board.hash:
+            return  # the position changed while the hint was computed
         
+        move = worker.move
         if move:
             r, c = move
             messagebox.showinfo("Hint", f"Suggested move: ({r+1}, {c+1})")
@@ -907,6 +1030,26 @@ class ModernGomokuGUI:
         
         self.root.after(3000, lambda: self.canvas.delete("hint"))
     
+    def save_ai_cache(self):
+        """
+        Write the AI's search results to the persistent cache (at game
+        end, or when an unfinished game is abandoned)
+        """
+        if self.ai_player is not None and self.board is not None:
+            try:
+                self.ai_player.save_cache(self.board.n)
+            except Exception as e:
+                print(f"⚠️ Could not save search cache: {e}")
+    
+    def on_close(self):
+        """Cancel any running search, save the cache and close the window"""
+        self.cancel_ai_search(wait=True)
+        if self.game_active:
+            self.save_ai_cache()
+        if self.cache is not None:
+            self.cache.close()
+        self.root.destroy()
+    
     def show_help(self):
         """Show help dialog"""
         help_text = """
@@ -955,6 +1098,7 @@ GOOD LUCK! 🍀
         self.game_active = False
         self.thinking_label.config(text="")
         self.ai_thinking = False
+        self.save_ai_cache()
         
         # Update stats
         if winner == "human":
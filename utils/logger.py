@@ -53,8 +53,12 @@ class GameLogger:
     
     def log_ai_thinking(self, depth, nodes_evaluated, search_time):
         """Log AI thinking process"""
-        self.logger.debug(f"AI Search - Depth: {depth}, "
-                         f"Nodes: {nodes_evaluated}, Time: {search_time:.2f}s")
+        self.logger.info(f"AI Search - Depth: {depth}, "
+                        f"Nodes: {nodes_evaluated}, Time: {search_time:.2f}s")
+    
+    def log_search_stats(self, stats):
+        """Log the detailed counters of one AI search (SearchStats.as_dict())"""
+        self.logger.info(f"AI Search Stats - {stats}")
     
     def log_error(self, error_message):
         """Log an error"""